@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Prophet forecasts computed straight from the fitted parameters with NumPy.
+
+Prophet's predict() builds several DataFrames and, for the intervals, draws
+`uncertainty_samples` simulated futures. For the models used here (linear or
+flat growth, Fourier seasonalities, no holidays or extra regressors) the same
+numbers follow in closed form:
+
+    yhat   trend(t) * (1 + X @ beta_m) + X @ beta_a * y_scale, exactly as Prophet
+    bounds the interval_width quantiles of what Prophet's vectorized sampler
+           draws: observation noise N(0, sigma_obs) plus, at each future
+           step, a slope change of Laplace(0, mean|delta|) size with
+           probability n_changepoints * dt, integrated twice
+
+The bounds come from that distribution's characteristic function instead of
+from simulated paths, so they carry no sampling noise; they differ from
+Prophet's by the noise in Prophet's own percentiles. Run this file to
+measure every uncertainty mode against the bundled models:
+
+    cd backend
+    python analytic_forecast.py --models ../Models/all_region_models.joblib
+"""
+import argparse
+import copy
+import statistics
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+UNCERTAINTY_MODES = ("full", "reduced", "none", "analytic")
+# Largest (steps x steps x frequencies) array built at once for multiplicative seasonality
+MAX_BLOCK_ELEMENTS = 2 * 1024 * 1024
+
+
+def supports(model) -> bool:
+    """Whether the closed form covers this fitted model"""
+    return (
+        model.growth in ("linear", "flat")
+        and not model.logistic_floor
+        and not model.extra_regressors
+        and model.holidays is None
+        and model.country_holidays is None
+        and all(props["condition_name"] is None for props in model.seasonalities.values())
+    )
+
+
+def _seasonal_features(model, days: np.ndarray) -> np.ndarray:
+    """Fourier features in Prophet's column order (seasonalities as added, sin/cos pairs)"""
+    columns = []
+    for props in model.seasonalities.values():
+        x = 2 * np.pi * days / props["period"]
+        for i in range(1, props["fourier_order"] + 1):
+            columns.append(np.sin(i * x))
+            columns.append(np.cos(i * x))
+    return np.column_stack(columns) if columns else np.empty((len(days), 0))
+
+
+def analytic_forecast(model, months: np.ndarray):
+    """(yhat, yhat_lower, yhat_upper) for datetime64 `months` after the training data"""
+    params = model.params
+    k = np.nanmean(params["k"])
+    m = np.nanmean(params["m"])
+    deltas = np.nanmean(params["delta"], axis=0)
+    y_scale = float(model.y_scale)
+    floor = float(model.y_min) if getattr(model, "scaling", "absmax") == "minmax" else 0.0
+
+    months = months.astype("datetime64[ns]")
+    t = (months - model.start.to_datetime64()) / model.t_scale.to_timedelta64()
+    if model.growth == "linear":
+        changepoints = np.asarray(model.changepoints_t)
+        deltas_t = (changepoints[None, :] <= t[:, None]) * deltas
+        trend = (deltas_t.sum(axis=1) + k) * t + (deltas_t * -changepoints).sum(axis=1) + m
+    else:
+        trend = np.full(len(t), m)
+    trend = trend * y_scale + floor
+
+    days = months.astype("datetime64[s]").astype(np.float64) / 86400
+    X = _seasonal_features(model, days)
+    beta = np.nanmean(params["beta"], axis=0)
+    components = model.train_component_cols
+    additive = X @ (beta * components["additive_terms"].to_numpy()) * y_scale
+    multiplicative = X @ (beta * components["multiplicative_terms"].to_numpy())
+    yhat = trend * (1 + multiplicative) + additive
+
+    if not model.uncertainty_samples or len(t) == 0:
+        nan = np.full(len(t), np.nan)
+        return yhat, nan, nan.copy()
+
+    # Prophet reads its noise and trend-change scale from the first parameter draw
+    noise_sd = float(np.ravel(params["sigma_obs"])[0]) * y_scale
+    q = (1 + model.interval_width) / 2
+    if model.growth == "flat" or noise_sd <= 0:
+        half_width = np.full(len(t), NormalDist().inv_cdf(q) * noise_sd)
+    else:
+        dt = np.diff(t).mean() if len(t) > 1 else np.diff(model.history["t"].to_numpy()).mean()
+        half_width = _trend_noise_quantile(
+            noise_sd, y_scale * (1 + multiplicative), (np.arange(len(t)) + 0.5) * dt,
+            p=len(model.changepoints_t) * dt, scale=np.mean(np.abs(params["delta"][0])) + 1e-8, q=q
+        )
+    return yhat, yhat - half_width, yhat + half_width
+
+
+def _trend_noise_quantile(noise_sd: float, trend_scale: np.ndarray, weights: np.ndarray,
+                          p: float, scale: float, q: float, newton_steps: int = 4) -> np.ndarray:
+    """q-quantile, j steps ahead, of N(0, noise_sd^2) + trend_scale[j] * sum_{r<=j} weights[r] * B_r * L_r
+
+    with B_r ~ Bernoulli(p) and L_r ~ Laplace(0, scale): Prophet's simulated
+    trend change plus observation noise. The distribution is symmetric and its
+    characteristic function is closed form, so the CDF is one integral
+    (Gil-Pelaez) on a grid, solved for q with a few Newton steps from the
+    normal quantile. The normal quantile alone is 10-30% too wide a year out,
+    because the trend shocks are rare and heavy tailed.
+    """
+    b2 = (scale * weights) ** 2
+    sd = np.sqrt(noise_sd ** 2 + trend_scale ** 2 * 2 * p * np.cumsum(b2))
+    # Gaussian noise makes phi negligible past 8.5 / noise_sd; keep u * x steps well under a radian
+    n_u = int(min(4096, max(128, 48 * sd.max() / noise_sd)))
+    u = np.linspace(0, 8.5 / noise_sd, n_u + 1)[1:]
+    du = u[0]
+
+    if np.all(trend_scale == trend_scale[0]):
+        # The j-step sum uses weights[:j + 1], so log phi is a running sum over steps
+        log_terms = np.log1p(-p + p / (1 + b2[:, None] * (trend_scale[0] * u[None, :]) ** 2))
+        log_phi = np.cumsum(log_terms, axis=0)
+    else:
+        # Step j has its own trend scale, so every step needs its own running sum: a (J, J, U) block.
+        # All of U at once is about 470 MB at J = 120; a chunk of U keeps each block near 16 MB
+        n = len(weights)
+        steps = np.arange(n)
+        log_phi = np.empty((n, len(u)))
+        chunk = max(1, MAX_BLOCK_ELEMENTS // (n * n))
+        for start in range(0, len(u), chunk):
+            part = u[start:start + chunk]
+            log_terms = np.log1p(-p + p / (1 + b2[None, :, None] * (trend_scale[:, None, None] * part) ** 2))
+            log_phi[:, start:start + chunk] = np.cumsum(log_terms, axis=1)[steps, steps]
+    phi = np.exp(log_phi - (noise_sd * u) ** 2 / 2)
+
+    x = NormalDist().inv_cdf(q) * sd
+    for _ in range(newton_steps):
+        ux = u * x[:, None]
+        # Trapezoid rule; the u = 0 terms are x (cdf) and 1 (pdf) with half weight
+        cdf = 0.5 + (x / 2 + (np.sin(ux) / u * phi).sum(axis=1)) * du / np.pi
+        pdf = (0.5 + (np.cos(ux) * phi).sum(axis=1)) * du / np.pi
+        x = x - (cdf - q) / pdf
+    return x
+
+
+def with_samples(model, samples: int):
+    """Shallow copy of a Prophet model drawing `samples` futures for its intervals (0 = none)"""
+    model = copy.copy(model)
+    model.uncertainty_samples = samples
+    return model
+
+
+# ----------------------------
+# Accuracy / speed report
+# ----------------------------
+def _interval_error(entry, reference) -> float:
+    """Mean absolute bound error as a fraction of the reference interval width"""
+    width = reference.yhat_upper - reference.yhat_lower
+    error = (np.abs(entry.yhat_lower - reference.yhat_lower) + np.abs(entry.yhat_upper - reference.yhat_upper)) / 2
+    return float(np.mean(error / width))
+
+
+def main():
+    from forecasting import REDUCED_UNCERTAINTY_SAMPLES, compute_forecast
+    from region_models import load_region_models
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", default="../Models/all_region_models.joblib", help="Region models artifact")
+    parser.add_argument("--horizon", type=int, default=36, help="Forecast months (default: 36)")
+    parser.add_argument("--reference-samples", type=int, default=20000,
+                        help="Simulated futures for the reference intervals (default: 20000)")
+    parser.add_argument("--regions", type=int, default=None, help="Only the first N regions")
+    args = parser.parse_args()
+
+    models = load_region_models(args.models)
+    regions = sorted(models.keys())[:args.regions]
+    times = {mode: [] for mode in UNCERTAINTY_MODES}
+    yhat_error = {mode: [] for mode in UNCERTAINTY_MODES}
+    bound_error = {mode: [] for mode in UNCERTAINTY_MODES if mode != "none"}
+
+    for region in regions:
+        model = models[region]
+        if isinstance(model, dict):
+            model = list(model.values())[0]
+        reference = compute_forecast(with_samples(model, args.reference_samples), args.horizon)
+        for mode in UNCERTAINTY_MODES:
+            start = time.perf_counter()
+            entry = compute_forecast(model, args.horizon, mode)
+            times[mode].append(time.perf_counter() - start)
+            yhat_error[mode].append(float(np.max(np.abs(entry.yhat - reference.yhat) / np.abs(reference.yhat))))
+            if mode in bound_error:
+                bound_error[mode].append(_interval_error(entry, reference))
+
+    print(f" {len(regions)} regions, horizon {args.horizon}, reference intervals from "
+          f"{args.reference_samples} samples (reduced = {REDUCED_UNCERTAINTY_SAMPLES})")
+    print(f" {'mode':<10} {'ms/region':>10} {'max yhat rel err':>17} {'bound err mean':>15} {'bound err max':>14}")
+    for mode in UNCERTAINTY_MODES:
+        bounds = bound_error.get(mode)
+        mean_err = f"{statistics.mean(bounds):.1%}" if bounds else "-"
+        max_err = f"{max(bounds):.1%}" if bounds else "-"
+        print(f" {mode:<10} {statistics.median(times[mode]) * 1000:>10.2f} {max(yhat_error[mode]):>17.1e} "
+              f"{mean_err:>15} {max_err:>14}")
+
+
+if __name__ == "__main__":
+    main()
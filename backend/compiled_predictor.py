@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Pandas-free price predictor compiled from a fitted real_estate_pipeline.
+
+CompiledPredictor reads everything the fitted pipeline learned - the feature
+engineer's localities, encoder classes, median and quantile, and the bagged
+trees' node arrays - and evaluates it with plain arithmetic and lookup
+tables. No DataFrame is built and sklearn's input validation is skipped:
+
+  * features: the same formulas as RealEstateFeatureEngineer.transform,
+    computed on NumPy columns and cast to float32 exactly like the trees do
+  * trees: children/feature/threshold/value arrays walked directly, in
+    Python for one property and level by level in NumPy for a batch
+
+Parity against the full pipeline, and single-property latency:
+
+    cd backend
+    python compiled_predictor.py
+"""
+import argparse
+import glob
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from feature_engineering import BALCONY_VALUES, is_hashable
+
+FEATURE_COLUMNS = ['log_area', 'Baths', 'Has_Balcony', 'BHK',
+                   'log_area_per_room', 'Bath_to_BHK_ratio', 'Total_Rooms', 'Area_Efficiency',
+                   'Area_x_Baths', 'log_Area_x_BHK', 'Is_Premium_Size', 'Has_Multiple_Baths', 'Price_per_Room',
+                   'Luxury_Score', 'City', 'Locality', 'Property_Size_Category', 'BHK_Category']
+# Canned properties covering every branch; checked whenever a pipeline is compiled
+PARITY_SAMPLE = [
+    {'Location': 'Whitefield, Bangalore', 'City': 'Bangalore', 'BHK': 3, 'Total_Area': 1000.0, 'Price_per_SQFT': 5000.0, 'Bathroom': 2, 'Balcony': True},
+    {'Location': 'Wagholi', 'City': 'Pune', 'BHK': 1, 'Total_Area': 450.0, 'Price_per_SQFT': 4200.0, 'Bathroom': 1, 'Balcony': False},
+    {'Location': 'Sarjapur, Bangalore', 'City': 'Bangalore', 'BHK': 2, 'Total_Area': 1200.0, 'Price_per_SQFT': 6500.0, 'Bathroom': 2, 'Balcony': None},
+    {'Location': 'Andheri West', 'City': 'Mumbai', 'BHK': 4, 'Total_Area': 2400.0, 'Price_per_SQFT': 21000.0, 'Bathroom': 4, 'Balcony': True},
+    {'Location': 'Avadi, Chennai', 'City': 'Chennai', 'BHK': 5, 'Total_Area': 1999.0, 'Price_per_SQFT': 3900.0, 'Bathroom': 3, 'Balcony': False},
+    {'Location': 'Sector 12 Dwarka', 'City': 'New Delhi', 'BHK': 0, 'Total_Area': 500.0, 'Price_per_SQFT': 9800.0, 'Bathroom': 1, 'Balcony': True},
+]
+
+
+def _to_float(value, default=np.nan) -> float:
+    """pd.to_numeric(errors='coerce') for one value"""
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class _CompiledTree:
+    """Node arrays of one fitted sklearn regression tree"""
+
+    def __init__(self, tree, feature_subset=None):
+        tree_ = tree.tree_
+        self.left = tree_.children_left.astype(np.int64)
+        self.right = tree_.children_right.astype(np.int64)
+        feature = tree_.feature.astype(np.int64)
+        if feature_subset is not None:
+            # Map the tree's feature positions back to full feature-vector positions
+            subset = np.asarray(feature_subset, dtype=np.int64)
+            feature = np.where(feature >= 0, subset[np.maximum(feature, 0)], feature)
+        self.feature = feature
+        self.threshold = tree_.threshold.astype(np.float64)
+        self.value = tree_.value[:, 0, 0].astype(np.float64)
+        # Python lists make the single-row walk several times faster than NumPy indexing
+        self._left = self.left.tolist()
+        self._right = self.right.tolist()
+        self._feature = self.feature.tolist()
+        self._threshold = self.threshold.tolist()
+        self._value = self.value.tolist()
+
+    def predict_one(self, x: List[float]) -> float:
+        left, right, feature, threshold = self._left, self._right, self._feature, self._threshold
+        node = 0
+        while left[node] != -1:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+        return self._value[node]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        node = np.zeros(len(X), dtype=np.int64)
+        rows = np.arange(len(X))
+        active = self.left[node] != -1
+        while active.any():
+            current = node[active]
+            go_left = X[rows[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+            active = self.left[node] != -1
+        return self.value[node]
+
+
+class CompiledPredictor:
+    """Fixed feature vector + direct tree evaluation for a fitted price pipeline"""
+
+    def __init__(self, pipeline):
+        feature_engineer = pipeline.steps[0][1]
+        model = pipeline.steps[-1][1]
+
+        self.top_localities = set(feature_engineer.top_localities)
+        self.price_per_sqft_median = float(feature_engineer.price_per_sqft_median)
+        self.area_quantile_75 = float(feature_engineer.area_quantile_75)
+        self.encoder_tables = feature_engineer._get_encoder_tables()
+
+        columns = list(getattr(model, "feature_names_in_", FEATURE_COLUMNS))
+        if sorted(columns) != sorted(FEATURE_COLUMNS):
+            raise ValueError(f"Unsupported feature set: {columns}")
+        self.column_order = [FEATURE_COLUMNS.index(c) for c in columns]
+
+        def codes(feature, labels):
+            table, other_code = self.encoder_tables.get(feature, ({}, 0))
+            return np.array([table.get(label, other_code) for label in labels], dtype=np.float64)
+
+        self.size_codes = codes('Property_Size_Category', ['Compact', 'Medium', 'Large', 'Luxury'])
+        self.bhk_codes = codes('BHK_Category', ['1BHK', '2BHK', '3BHK', '4+BHK'])
+
+        if hasattr(model, "estimators_features_"):  # BaggingRegressor
+            trees = zip(model.estimators_, model.estimators_features_)
+        elif hasattr(model, "estimators_"):  # RandomForest / ExtraTrees
+            trees = ((estimator, None) for estimator in model.estimators_)
+        elif hasattr(model, "tree_"):  # single DecisionTreeRegressor
+            trees = [(model, None)]
+        else:
+            raise TypeError(f"Cannot compile estimator {type(model).__name__}")
+        self.trees = []
+        for estimator, subset in trees:
+            if not hasattr(estimator, "tree_"):
+                raise TypeError(f"Cannot compile base estimator {type(estimator).__name__}")
+            self.trees.append(_CompiledTree(estimator, subset))
+
+    def features(self, properties: List[Dict]) -> np.ndarray:
+        """float32 feature matrix in the estimator's column order, as the trees see it"""
+        n = len(properties)
+        area = np.array([_to_float(p.get('Total_Area')) for p in properties])
+        pps = np.array([_to_float(p.get('Price_per_SQFT')) for p in properties])
+        bhk = np.array([_to_float(p.get('BHK', 2), 2.0) for p in properties])
+        baths = np.array([_to_float(p.get('Baths', p.get('Bathroom', 1)), 1.0) for p in properties])
+        bhk[np.isnan(bhk)] = 2.0
+        baths[np.isnan(baths)] = 1.0
+        has_balcony = np.array([BALCONY_VALUES.get(p.get('Balcony'), 0) if is_hashable(p.get('Balcony')) else 0
+                                for p in properties], dtype=np.float64)
+
+        missing_area = np.isnan(area)
+        if missing_area.any() and not missing_area.all():
+            area[missing_area] = np.median(area[~missing_area])
+        pps[np.isnan(pps)] = self.price_per_sqft_median
+
+        city_table, city_other = self.encoder_tables['City']
+        locality_table, locality_other = self.encoder_tables['Locality']
+        # Same per-row rule as transform: "Locality, City" is split, anything else is taken as is
+        any_comma = any(isinstance(p.get('Location'), str) and ',' in p['Location'] for p in properties)
+        city = np.empty(n)
+        locality = np.empty(n)
+        for i, p in enumerate(properties):
+            location = p.get('Location', 'Unknown')
+            if any_comma and isinstance(location, str) and ',' in location:
+                parts = location.split(',')
+                loc_name, city_name = parts[0].strip(), parts[-1].strip()
+            else:
+                loc_name, city_name = location, p.get('City', 'Unknown')
+            if not is_hashable(loc_name) or loc_name not in self.top_localities:
+                loc_name = 'Other'
+            city[i] = city_table.get(str(city_name), city_other)
+            locality[i] = locality_table.get(str(loc_name), locality_other)
+
+        rooms = np.maximum(bhk, 1)
+        area_per_room = area / rooms
+        total_rooms = bhk + baths
+        area_x_bhk = area * bhk
+
+        X = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float64)
+        X[:, 0] = np.log1p(area)
+        X[:, 1] = baths
+        X[:, 2] = has_balcony
+        X[:, 3] = bhk
+        X[:, 4] = np.log1p(area_per_room)
+        X[:, 5] = baths / rooms
+        X[:, 6] = total_rooms
+        X[:, 7] = area / np.maximum(total_rooms, 1)
+        X[:, 8] = area * baths
+        X[:, 9] = np.log1p(area_x_bhk)
+        X[:, 10] = area > self.area_quantile_75
+        X[:, 11] = baths >= 2
+        X[:, 12] = pps * area_per_room
+        X[:, 13] = (np.select([area > 1500, area > 1000], [2, 1], default=0)
+                    + np.select([bhk >= 4, bhk >= 3], [2, 1], default=0)
+                    + (baths >= 3) + (has_balcony != 0))
+        X[:, 14] = city
+        X[:, 15] = locality
+        X[:, 16] = np.select([area < 500, area < 1000, area < 2000], self.size_codes[:3], default=self.size_codes[3])
+        X[:, 17] = np.select([bhk <= 1, bhk <= 2, bhk <= 3], self.bhk_codes[:3], default=self.bhk_codes[3])
+        return X[:, self.column_order].astype(np.float32)
+
+    def predict(self, property_data: Dict) -> float:
+        x = self.features([property_data])[0].tolist()
+        total = 0.0
+        for tree in self.trees:
+            total += tree.predict_one(x)
+        return total / len(self.trees)
+
+    def predict_many(self, properties: List[Dict]) -> List[float]:
+        if not properties:
+            return []
+        X = self.features(properties)
+        total = np.zeros(len(X))
+        for tree in self.trees:
+            total += tree.predict(X)
+        return (total / len(self.trees)).tolist()
+
+
+def check_parity(pipeline, compiled: CompiledPredictor, properties: List[Dict], rtol: float = 1e-9) -> float:
+    """Max relative difference between compiled and pipeline predictions; raises past rtol"""
+    import pandas as pd
+
+    expected = pipeline.predict(pd.DataFrame(properties))
+    batch = np.array(compiled.predict_many(properties))
+    single = np.array([compiled.predict(p) for p in properties])
+    diff = max(
+        np.max(np.abs(batch - expected) / np.maximum(np.abs(expected), 1e-12)),
+        np.max(np.abs(single - expected) / np.maximum(np.abs(expected), 1e-12))
+    )
+    if diff > rtol:
+        raise AssertionError(f"Compiled predictor differs from the pipeline (max relative diff {diff:.3g})")
+    return float(diff)
+
+
+def main():
+    import joblib
+    import pandas as pd
+    from transform_parity import make_api_rows
+
+    default_glob = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models", "real_estate_pipeline_v*.joblib")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Pipeline .joblib (default: newest in Models/)")
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic properties for the parity check")
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model or sorted(glob.glob(default_glob))[-1])
+    for _, step in pipeline.steps:
+        if hasattr(step, "n_jobs"):
+            step.n_jobs = 1
+    compiled = CompiledPredictor(pipeline)
+
+    properties = PARITY_SAMPLE + make_api_rows(pipeline.steps[0][1], args.rows).to_dict(orient="records")
+    diff = check_parity(pipeline, compiled, properties)
+    print(f" Parity OK on {len(properties)} properties (max relative diff {diff:.2g})")
+
+    sample = properties[:200]
+    for name, predict in (("pipeline", lambda p: float(pipeline.predict(pd.DataFrame([p]))[0])),
+                          ("compiled", compiled.predict)):
+        timings = []
+        for p in sample:
+            start = time.perf_counter()
+            predict(p)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f" {name:>9}: p50 {timings[len(timings) // 2]:.3f} ms, p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Bounded execution pools for CPU-bound inference.
+
+Each workload (price scoring, forecasting) gets its own WorkloadPool so a
+burst of one cannot starve the other. A pool admits at most
+`workers + max_queue` jobs; beyond that a request is rejected immediately
+with 503 instead of waiting in an unbounded queue. Routes can also carry
+their own concurrency limit, rejected with 429.
+"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+
+class PoolSaturated(Exception):
+    """Raised instead of queueing when a pool or route is at its limit"""
+
+    def __init__(self, detail: str, status_code: int = 503, retry_after: int = 1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class WorkloadPool:
+    """Thread or process pool with an admission limit and per-route concurrency caps.
+
+    Admission bookkeeping happens on the event loop thread, so plain counters
+    are enough.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, use_processes: bool = False,
+                 route_limits: Optional[Dict[str, int]] = None,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self.route_limits = route_limits or {}
+        self.in_flight = 0
+        self.route_in_flight = {}
+        self.completed = 0
+        self.rejected = 0
+        if use_processes:
+            # spawn: workers import only what the job needs, never the parent's threads or models
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer, initargs=initargs
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f"{name}-pool",
+                initializer=initializer, initargs=initargs
+            )
+
+    async def run(self, route: str, func: Callable, *args, **kwargs):
+        """Run func(*args, **kwargs) on the pool, or raise PoolSaturated without queueing"""
+        self._admit(route)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.route_in_flight[route] -= 1
+            self.completed += 1
+
+    async def run_each(self, route: str, func: Callable, items: Iterable, *args,
+                       max_in_flight: Optional[int] = None) -> AsyncIterator[Tuple]:
+        """Run func(item, *args) for every item, yielding (item, result, error) as each one finishes.
+
+        The whole batch is admitted once, like a single run() call, and keeps
+        at most `max_in_flight` (default: every worker) of its jobs on the pool.
+        Jobs not yet started are cancelled if the consumer stops early; jobs
+        already running keep their admission (and the route slot) until they
+        actually finish.
+        """
+        self._admit(route)
+        loop = asyncio.get_running_loop()
+        limit = max_in_flight or self.workers
+        items = iter(items)
+        pending = {}  # asyncio future -> (item, executor future)
+        try:
+            while True:
+                for item in items:
+                    job = self.executor.submit(functools.partial(func, item, *args))
+                    pending[asyncio.wrap_future(job, loop=loop)] = (item, job)
+                    self.in_flight += 1
+                    if len(pending) >= limit:
+                        break
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    item, _ = pending.pop(future)
+                    self.in_flight -= 1
+                    self.completed += 1
+                    # Cancelled when the pool shuts down under a running batch
+                    error = asyncio.CancelledError("job cancelled") if future.cancelled() else future.exception()
+                    yield item, None if error else future.result(), error
+        finally:
+            running = [job for _, job in pending.values() if not job.cancel()]
+            self.in_flight -= len(pending) - len(running)
+            if running:
+                for job in running:
+                    job.add_done_callback(functools.partial(self._job_done, loop, route, running))
+            else:
+                self.route_in_flight[route] -= 1
+
+    def _job_done(self, loop, route: str, running: list, job):
+        """Executor callback for a job left running by an abandoned batch; hands back to the loop thread"""
+        def release():
+            running.remove(job)
+            self.in_flight -= 1
+            self.completed += 1
+            if not running:
+                self.route_in_flight[route] -= 1
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:  # loop already closed at shutdown
+            pass
+
+    def _admit(self, route: str):
+        route_limit = self.route_limits.get(route)
+        route_in_flight = self.route_in_flight.get(route, 0)
+        if route_limit and route_in_flight >= route_limit:
+            self.rejected += 1
+            raise PoolSaturated(f"Too many concurrent {route} requests", status_code=429)
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PoolSaturated(f"{self.name} pool is saturated", status_code=503)
+        self.route_in_flight[route] = route_in_flight + 1
+
+    def stats(self) -> Dict:
+        return {
+            "kind": "process" if self.use_processes else "thread",
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "route_in_flight": dict(self.route_in_flight),
+            "route_limits": dict(self.route_limits)
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_route_limits(value: str) -> Dict[str, int]:
+    """Parse "/predict_price=64,/forecast=8" into {"/predict_price": 64, "/forecast": 8}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        route, _, limit = item.partition("=")
+        limits[route.strip()] = int(limit)
+    return limits
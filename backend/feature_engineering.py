@@ -2,9 +2,36 @@
 import pandas as pd
 import numpy as np
 import re
+import weakref
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import LabelEncoder
 
+# Balcony spellings a request may use; shared by transform, CompiledPredictor and the prediction cache keys
+BALCONY_VALUES = {'Yes': 1, 'Y': 1, 'No': 0, 'N': 0, True: 1, False: 0}
+
+
+def is_hashable(value) -> bool:
+    """Whether value can be looked up in a dict or set (request fields may be lists or dicts)"""
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
+def _map_unique(series, func):
+    """Apply a column-wise function to the distinct values of series and broadcast the result back"""
+    codes, uniques = pd.factorize(series)
+    # Missing values get code -1, which picks the trailing NaN
+    mapped = np.append(np.asarray(func(pd.Series(uniques)), dtype=object), np.nan)
+    return pd.Series(mapped[codes], index=series.index)
+
+
+def _last_location_part(location):
+    parts = location.str.rsplit(',', n=1, expand=True)
+    return parts.iloc[:, -1].fillna(parts[0]).str.strip()
+
+
 class RealEstateFeatureEngineer(BaseEstimator, TransformerMixin):
     
     def __init__(self):
@@ -45,252 +72,349 @@ class RealEstateFeatureEngineer(BaseEstimator, TransformerMixin):
         """Fit on training data - EXACT replication of Multiple Algorithms preprocessing"""
         print(" Fitting Feature Engineering Pipeline (Multiple Algorithms Method)...")
         
-        # Step 1: Data Cleaning (EXACT copy from Multiple Algorithms)
-        df = X.copy()
-        df = df.drop_duplicates()
-        
-        # Parse price (training only)
-        if 'Price' in df.columns:
-            df['Price_in_Lakhs'] = df['Price'].apply(self._parse_price_training)
-        
-        # Location parsing
-        df['Location_split'] = df['Location'].str.split(',')
-        df['Locality'] = df['Location_split'].apply(lambda x: x[0].strip() if x and len(x) > 0 else 'Unknown')
-        df['City'] = df['Location_split'].apply(lambda x: x[-1].strip() if x and len(x) > 0 else 'Unknown')
-        
-        # BHK extraction
-        def extract_bhk(title):
-            if pd.isna(title):
-                return 0
-            bhk_match = re.search(r'(\d+)\s*BHK', str(title), re.IGNORECASE)
-            return int(bhk_match.group(1)) if bhk_match else 0
-        
-        df['BHK'] = df['Property Title'].apply(extract_bhk)
-        
-        df['Has_Balcony'] = df['Balcony'].map({'Yes': 1, 'Y': 1, 'No': 0, 'N': 0}).fillna(0)
-        
-        df['Total_Area'] = pd.to_numeric(df['Total_Area'], errors='coerce')
-        df['Price_per_SQFT'] = pd.to_numeric(df['Price_per_SQFT'], errors='coerce')
-        df['Baths'] = pd.to_numeric(df['Baths'], errors='coerce').fillna(1)
-        
-        df['Total_Area'] = df['Total_Area'].fillna(df.groupby('BHK')['Total_Area'].transform('median'))
-
-        locality_counts = df['Locality'].value_counts()
-        self.top_localities = locality_counts.nlargest(30).index.tolist()
-        df.loc[~df['Locality'].isin(self.top_localities), 'Locality'] = 'Other'
-        
-        # Step 2: Outlier Removal (EXACT copy from Multiple Algorithms)
-        print("   Applying outlier removal...")
-        def remove_outliers_iqr(series, factor=1.5):
-            Q1 = series.quantile(0.25)
-            Q3 = series.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - factor * IQR
-            upper_bound = Q3 + factor * IQR
-            return (series >= lower_bound) & (series <= upper_bound)
-        
-        initial_count = len(df)
-        
-        # Apply to key columns
-        price_mask = remove_outliers_iqr(df['Price_in_Lakhs'].dropna())
-        area_mask = remove_outliers_iqr(df['Total_Area'].dropna())
-        pps_mask = remove_outliers_iqr(df['Price_per_SQFT'].dropna())
-        
-        # Combine masks
-        valid_price_idx = df['Price_in_Lakhs'].dropna().index
-        combined_mask = price_mask & area_mask & pps_mask
-        outlier_idx = valid_price_idx[~combined_mask]
-        
-        df = df.drop(outlier_idx)
-        
-        removed_count = initial_count - len(df)
-        print(f"     Removed {removed_count} outliers ({removed_count/initial_count*100:.1f}%)")
+        # Steps 1-2: Data cleaning and outlier removal, shared with get_target and transform
+        df, _, self.top_localities = self._clean_training(X)
         
         # Step 3: Store statistics AFTER outlier removal
         self.price_per_sqft_median = df['Price_per_SQFT'].median()
         self.area_quantile_75 = df['Total_Area'].quantile(0.75)
         
-        # Step 4: Create categorical features
-        df['Property_Size_Category'] = df['Total_Area'].apply(self.categorize_property_size)
-        df['BHK_Category'] = df['BHK'].apply(self.categorize_bhk)
+        # Step 4: Create categorical features (same bins as categorize_property_size / categorize_bhk)
+        area = df['Total_Area'].to_numpy(dtype=np.float64)
+        bhk = df['BHK'].to_numpy()
+        categorical = {
+            'City': df['City'],
+            'Locality': df['Locality'],
+            'Property_Size_Category': pd.Series(np.select(
+                [area < 500, area < 1000, area < 2000], ['Compact', 'Medium', 'Large'], default='Luxury'
+            )),
+            'BHK_Category': pd.Series(np.select(
+                [bhk <= 1, bhk <= 2, bhk <= 3], ['1BHK', '2BHK', '3BHK'], default='4+BHK'
+            )),
+        }
         
         # Step 5: Fit label encoders
-        categorical_features = ['City', 'Locality', 'Property_Size_Category', 'BHK_Category']
-        
-        for feature in categorical_features:
-            if feature in df.columns:
-                le = LabelEncoder()
-                le.fit(df[feature].astype(str))
-                self.label_encoders[feature] = le
+        for feature, values in categorical.items():
+            le = LabelEncoder()
+            le.fit(values.astype(str))
+            self.label_encoders[feature] = le
+        self._build_encoder_tables()
+        self._release_training(X, 'fit')
         
         print(" Feature Engineering Pipeline fitted with Multiple Algorithms method!")
         return self
         
     def transform(self, X):
-        """Transform data for prediction"""
-        print(" Transforming data...")
-        df = X.copy()
+        """Transform data for prediction.
+        
+        Fully columnar: every feature is computed on whole columns and the
+        result frame is assembled once, so the cost per row is flat from a
+        single API request up to bulk scoring.
+        """
+        df = X
+        n = len(df)
         
         # Extract BHK if not present (for training data)
-        if 'BHK' not in df.columns:
-            if 'Property Title' in df.columns:
-                df['BHK'] = df['Property Title'].apply(self._extract_bhk_training)
-            else:
-                df['BHK'] = 2  # Default value
+        if 'BHK' in df.columns:
+            bhk = df['BHK']
+        elif 'Property Title' in df.columns:
+            bhk = df['Property Title'].apply(self._extract_bhk_training)
+        else:
+            bhk = pd.Series(2, index=df.index)  # Default value
         
         # Handle location columns
-        if 'Locality' not in df.columns:
-            if 'Location' in df.columns and any(',' in str(loc) for loc in df['Location'].dropna()):
-                df['Location_split'] = df['Location'].str.split(',')
-                df['Locality'] = df['Location_split'].apply(lambda x: x[0].strip() if x and len(x) > 0 else 'Unknown')
-                df['City'] = df['Location_split'].apply(lambda x: x[-1].strip() if x and len(x) > 0 else 'Unknown')
+        if 'Locality' in df.columns:
+            locality = df['Locality']
+            city = df['City'] if 'City' in df.columns else None
+        else:
+            has_comma = None
+            if 'Location' in df.columns:
+                has_comma = df['Location'].astype(str).str.contains(',', regex=False) & df['Location'].notna()
+            if has_comma is not None and has_comma.any():
+                # Split row by row so a batch scores every property exactly as a single-row call would
+                location_split = df['Location'].where(has_comma).str.split(',')
+                locality = location_split.str[0].str.strip().where(has_comma, df['Location'])
+                city = location_split.str[-1].str.strip().where(has_comma, df['City'] if 'City' in df.columns else 'Unknown')
             else:
-                df['Locality'] = df.get('Location', 'Unknown')
-                df['City'] = df.get('City', 'Unknown')
+                locality = df['Location'] if 'Location' in df.columns else pd.Series('Unknown', index=df.index)
+                city = df['City'] if 'City' in df.columns else pd.Series('Unknown', index=df.index)
         
         # Handle bathroom column name
-        if 'Baths' not in df.columns:
-            df['Baths'] = df.get('Bathroom', 1)
+        if 'Baths' in df.columns:
+            baths = df['Baths']
+        else:
+            baths = df['Bathroom'] if 'Bathroom' in df.columns else pd.Series(1, index=df.index)
         
         # Handle balcony
-        if 'Has_Balcony' not in df.columns:
-            if 'Balcony' in df.columns:
-                df['Has_Balcony'] = df['Balcony'].map({'Yes': 1, 'Y': 1, 'No': 0, 'N': 0, True: 1, False: 0}).fillna(0)
-            else:
-                df['Has_Balcony'] = 0
+        if 'Has_Balcony' in df.columns:
+            has_balcony = df['Has_Balcony']
+        elif 'Balcony' in df.columns:
+            has_balcony = df['Balcony'].map(BALCONY_VALUES).fillna(0)
+        else:
+            has_balcony = pd.Series(0, index=df.index)
         
         # Basic data cleaning and type conversion
-        df['Total_Area'] = pd.to_numeric(df['Total_Area'], errors='coerce')
-        df['Price_per_SQFT'] = pd.to_numeric(df['Price_per_SQFT'], errors='coerce')
-        df['BHK'] = pd.to_numeric(df['BHK'], errors='coerce').fillna(2)
-        df['Baths'] = pd.to_numeric(df['Baths'], errors='coerce').fillna(1)
+        total_area = pd.to_numeric(df['Total_Area'], errors='coerce')
+        price_per_sqft = pd.to_numeric(df['Price_per_SQFT'], errors='coerce')
+        bhk = pd.to_numeric(bhk, errors='coerce').fillna(2)
+        baths = pd.to_numeric(baths, errors='coerce').fillna(1)
         
         # Fill missing values
-        df['Total_Area'] = df['Total_Area'].fillna(df['Total_Area'].median())
-        df['Price_per_SQFT'] = df['Price_per_SQFT'].fillna(self.price_per_sqft_median)
-        df['Has_Balcony'] = df['Has_Balcony'].fillna(0)
+        total_area = total_area.fillna(total_area.median())
+        price_per_sqft = price_per_sqft.fillna(self.price_per_sqft_median)
+        has_balcony = has_balcony.fillna(0)
         
         # Handle location grouping
-        df.loc[~df['Locality'].isin(self.top_localities), 'Locality'] = 'Other'
-        
-        # Create categorical features
-        df['Property_Size_Category'] = df['Total_Area'].apply(self.categorize_property_size)
-        df['BHK_Category'] = df['BHK'].apply(self.categorize_bhk)
+        locality = locality.to_numpy(dtype=object).copy()
+        locality[~pd.Series(locality).isin(self.top_localities).to_numpy()] = 'Other'
+        
+        area = total_area.to_numpy(dtype=np.float64)
+        bhk_values = bhk.to_numpy()
+        baths_values = baths.to_numpy()
+        pps = price_per_sqft.to_numpy()
+        
+        # Create categorical features (same bins as categorize_property_size / categorize_bhk)
+        property_size_category = np.select(
+            [area < 500, area < 1000, area < 2000], ['Compact', 'Medium', 'Large'], default='Luxury'
+        ).astype(object)
+        bhk_category = np.select(
+            [bhk_values <= 1, bhk_values <= 2, bhk_values <= 3], ['1BHK', '2BHK', '3BHK'], default='4+BHK'
+        ).astype(object)
         
         # =============== ADVANCED FEATURE ENGINEERING (Match Multiple_Algorithms) ===============
         # 1. Log transformations (trees can handle these well)
-        df['log_area'] = np.log1p(df['Total_Area'])
-        df['log_price_per_sqft'] = np.log1p(df['Price_per_SQFT'].fillna(self.price_per_sqft_median))
+        log_area = np.log1p(area)
         
         # 2. Ratio features (very important for pricing)
-        df['Area_per_Room'] = df['Total_Area'] / np.maximum(df['BHK'], 1)
-        df['log_area_per_room'] = np.log1p(df['Area_per_Room'])
-        df['Bath_to_BHK_ratio'] = df['Baths'] / np.maximum(df['BHK'], 1)
-        df['Total_Rooms'] = df['BHK'] + df['Baths']
-        df['Area_Efficiency'] = df['Total_Area'] / np.maximum(df['Total_Rooms'], 1)
+        area_per_room = area / np.maximum(bhk_values, 1)
+        log_area_per_room = np.log1p(area_per_room)
+        bath_to_bhk_ratio = baths_values / np.maximum(bhk_values, 1)
+        total_rooms = bhk_values + baths_values
+        area_efficiency = area / np.maximum(total_rooms, 1)
         
         # 3. Interaction features (trees excel at these)
-        df['Area_x_BHK'] = df['Total_Area'] * df['BHK']
-        df['Area_x_Baths'] = df['Total_Area'] * df['Baths']
-        df['log_Area_x_BHK'] = np.log1p(df['Area_x_BHK'])
+        area_x_bhk = area * bhk_values
+        area_x_baths = area * baths_values
+        log_area_x_bhk = np.log1p(area_x_bhk)
         
         # 4. Advanced features for price prediction
-        df['Price_per_Room'] = df['Price_per_SQFT'] * df['Area_per_Room']
-        df['Is_Premium_Size'] = (df['Total_Area'] > self.area_quantile_75).astype(int)
-        df['Has_Multiple_Baths'] = (df['Baths'] >= 2).astype(int)
-        
-        # Create luxury score
-        df['Luxury_Score'] = df.apply(self.calculate_luxury_score, axis=1)
-        
-        # Encode categorical variables
-        categorical_features = ['City', 'Locality', 'Property_Size_Category', 'BHK_Category']
-        for feature in categorical_features:
-            if feature in df.columns and feature in self.label_encoders:
-                le = self.label_encoders[feature]
-                # Handle unseen categories
-                df[feature] = df[feature].astype(str).apply(
-                    lambda x: x if x in le.classes_ else 'Other'
-                )
-                # Add 'Other' to classes if needed
-                if 'Other' not in le.classes_:
-                    le.classes_ = np.append(le.classes_, 'Other')
-                df[feature] = le.transform(df[feature])
+        price_per_room = pps * area_per_room
+        is_premium_size = (area > self.area_quantile_75).astype(np.int64)
+        has_multiple_baths = (baths_values >= 2).astype(np.int64)
+        
+        # Create luxury score (same rules as calculate_luxury_score)
+        luxury_score = (
+            np.select([area > 1500, area > 1000], [2, 1], default=0)
+            + np.select([bhk_values >= 4, bhk_values >= 3], [2, 1], default=0)
+            + (baths_values >= 3)
+            + has_balcony.astype(bool).to_numpy()
+        ).astype(np.int64)
+        
+        categorical = {
+            'City': None if city is None else np.asarray(city, dtype=object),
+            'Locality': locality,
+            'Property_Size_Category': property_size_category,
+            'BHK_Category': bhk_category,
+        }
+        
+        # Encode categorical variables through precomputed lookup tables; unseen values map to 'Other'
+        for feature, (table, other_code) in self._get_encoder_tables().items():
+            if categorical.get(feature) is not None:
+                codes = pd.Series(categorical[feature]).astype(str).map(table).fillna(other_code)
+                categorical[feature] = codes.to_numpy(dtype=np.int64)
         
         # Select final features for prediction (EXACT MATCH to Multiple_Algorithms)
-        feature_cols = ['log_area', 'Baths', 'Has_Balcony', 'BHK',
-    'log_area_per_room', 'Bath_to_BHK_ratio', 'Total_Rooms', 'Area_Efficiency',
-    'Area_x_Baths', 'log_Area_x_BHK', 'Is_Premium_Size', 'Has_Multiple_Baths','Price_per_Room',
-      'Luxury_Score','City', 'Locality', 'Property_Size_Category', 'BHK_Category']
-        
-        # Ensure all required features exist
-        for col in feature_cols:
-            if col not in df.columns:
-                df[col] = 0
-        
-        result = df[feature_cols]
-        print(f" Transformed data shape: {result.shape}")
-        return result
+        features = {
+            'log_area': log_area,
+            'Baths': baths_values,
+            'Has_Balcony': has_balcony.to_numpy(),
+            'BHK': bhk_values,
+            'log_area_per_room': log_area_per_room,
+            'Bath_to_BHK_ratio': bath_to_bhk_ratio,
+            'Total_Rooms': total_rooms,
+            'Area_Efficiency': area_efficiency,
+            'Area_x_Baths': area_x_baths,
+            'log_Area_x_BHK': log_area_x_bhk,
+            'Is_Premium_Size': is_premium_size,
+            'Has_Multiple_Baths': has_multiple_baths,
+            'Price_per_Room': price_per_room,
+            'Luxury_Score': luxury_score,
+        }
+        for feature, values in categorical.items():
+            # Ensure all required features exist
+            features[feature] = np.zeros(n, dtype=np.int64) if values is None else values
+        
+        return pd.DataFrame(features, index=df.index)
+    
+    def _build_encoder_tables(self):
+        """Build value -> code lookup tables from the fitted label encoders.
+        
+        Codes follow le.classes_ with 'Other' appended when missing, which is
+        what the row-by-row encoding produced, without mutating the encoders.
+        """
+        self._encoder_tables = {}
+        for feature, le in self.label_encoders.items():
+            classes = list(le.classes_)
+            if 'Other' not in classes:
+                classes.append('Other')
+            table = {str(value): code for code, value in enumerate(classes)}
+            self._encoder_tables[feature] = (table, table['Other'])
+        return self._encoder_tables
+    
+    def _get_encoder_tables(self):
+        tables = getattr(self, '_encoder_tables', None)
+        if tables is None:
+            tables = self._build_encoder_tables()
+        return tables
+    
+    def fit_transform(self, X, y=None, **fit_params):
+        """Fit, then transform the cleaned rows of X that have a target, aligned with get_target.
+        
+        Unlike TransformerMixin.fit_transform, the result has fewer rows than
+        X: unparseable prices and outliers are dropped, exactly as for
+        get_target(X), so the two line up for the estimator. Only here does
+        transform see the training cleaning; a later transform(X) scores
+        every row of X.
+        """
+        df, target, _ = self._clean_training(X)
+        self.fit(X, y, **fit_params)
+        return self.transform(df.loc[target.index])
+    
+    def __setstate__(self, state):
+        # Pipelines pickled before the lookup tables existed get them at load time
+        super().__setstate__(state)
+        self._build_encoder_tables()
     
     def get_target(self, X):
         """Extract target variable with EXACT Multiple Algorithms preprocessing"""
-        df = X.copy()
-        if 'Price' in df.columns:
-            # Apply EXACT same preprocessing as fit method
-            df = df.drop_duplicates()
-            
-            # Parse price
-            df['Price_in_Lakhs'] = df['Price'].apply(self._parse_price_training)
-            
-            # Location parsing
-            df['Location_split'] = df['Location'].str.split(',')
-            df['Locality'] = df['Location_split'].apply(lambda x: x[0].strip() if x and len(x) > 0 else 'Unknown')
-            df['City'] = df['Location_split'].apply(lambda x: x[-1].strip() if x and len(x) > 0 else 'Unknown')
-            
-            # BHK extraction
-            def extract_bhk(title):
-                if pd.isna(title):
-                    return 0
-                bhk_match = re.search(r'(\d+)\s*BHK', str(title), re.IGNORECASE)
-                return int(bhk_match.group(1)) if bhk_match else 0
-            
-            df['BHK'] = df['Property Title'].apply(extract_bhk)
-            
-            df['Has_Balcony'] = df['Balcony'].map({'Yes': 1, 'Y': 1, 'No': 0, 'N': 0}).fillna(0)
-            
-            df['Total_Area'] = pd.to_numeric(df['Total_Area'], errors='coerce')
-            df['Price_per_SQFT'] = pd.to_numeric(df['Price_per_SQFT'], errors='coerce')
-            df['Baths'] = pd.to_numeric(df['Baths'], errors='coerce').fillna(1)
-            
-            df['Total_Area'] = df['Total_Area'].fillna(df.groupby('BHK')['Total_Area'].transform('median'))
-
-            locality_counts = df['Locality'].value_counts()
-            top_localities = locality_counts.nlargest(30).index.tolist()
-            df.loc[~df['Locality'].isin(top_localities), 'Locality'] = 'Other'
-            
-            # Apply EXACT outlier removal
-            def remove_outliers_iqr(series, factor=1.5):
-                Q1 = series.quantile(0.25)
-                Q3 = series.quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - factor * IQR
-                upper_bound = Q3 + factor * IQR
-                return (series >= lower_bound) & (series <= upper_bound)
-            
-            # Apply to key columns
-            price_mask = remove_outliers_iqr(df['Price_in_Lakhs'].dropna())
-            area_mask = remove_outliers_iqr(df['Total_Area'].dropna())
-            pps_mask = remove_outliers_iqr(df['Price_per_SQFT'].dropna())
-            
-            # Combine masks
-            valid_price_idx = df['Price_in_Lakhs'].dropna().index
-            combined_mask = price_mask & area_mask & pps_mask
-            outlier_idx = valid_price_idx[~combined_mask]
-            
-            df = df.drop(outlier_idx)
-            
-            return df['Price_in_Lakhs'].dropna()
-        else:
+        _, target, _ = self._clean_training(X)
+        self._release_training(X, 'target')
+        return target
+    
+    def _clean_training(self, X):
+        """Clean a raw training scrape once for fit, get_target and transform.
+        
+        Returns (cleaned frame, target, top localities). Every stage works on
+        whole columns, and the result is memoized by the identity of X, so
+        fit, get_target and the transform inside fit_transform share one
+        pass. The memo is dropped once both fit and get_target have used it,
+        or when X itself is garbage collected. Modifying X in place between
+        those calls is not detected.
+        """
+        if 'Price' not in X.columns:
             raise ValueError("Price column not found - cannot extract target")
+        
+        cached = self._cached_training(X)
+        if cached is not None:
+            return cached
+        
+        # Step 1: Data Cleaning (EXACT copy from Multiple Algorithms)
+        df = X.drop_duplicates()
+        
+        # Parse price (training only)
+        # String parsing runs once per distinct value: scrapes repeat prices, locations and titles
+        price_in_lakhs = _map_unique(df['Price'], self._parse_prices_training).astype(np.float64)
+        
+        # Location parsing: first comma-separated part is the locality, last part the city
+        locality = _map_unique(
+            df['Location'], lambda loc: loc.str.split(',', n=1, expand=True)[0].str.strip()
+        ).fillna('Unknown')
+        city = _map_unique(df['Location'], _last_location_part).fillna('Unknown')
+        
+        # BHK extraction
+        bhk = pd.to_numeric(_map_unique(
+            df['Property Title'],
+            lambda title: title.astype(str).str.extract(r'(\d+)\s*BHK', flags=re.IGNORECASE)[0]
+        ), errors='coerce').fillna(0).astype(np.int64)
+        
+        df = df.assign(
+            Price_in_Lakhs=price_in_lakhs,
+            Locality=locality,
+            City=city,
+            BHK=bhk,
+            Has_Balcony=df['Balcony'].map({'Yes': 1, 'Y': 1, 'No': 0, 'N': 0}).fillna(0),
+            Total_Area=pd.to_numeric(df['Total_Area'], errors='coerce'),
+            Price_per_SQFT=pd.to_numeric(df['Price_per_SQFT'], errors='coerce'),
+            Baths=pd.to_numeric(df['Baths'], errors='coerce').fillna(1),
+        )
+        
+        df['Total_Area'] = df['Total_Area'].fillna(df.groupby('BHK')['Total_Area'].transform('median'))
+
+        locality_counts = df['Locality'].value_counts()
+        top_localities = locality_counts.nlargest(30).index.tolist()
+        df['Locality'] = df['Locality'].where(df['Locality'].isin(top_localities), 'Other')
+        
+        # Step 2: Outlier Removal (EXACT copy from Multiple Algorithms)
+        print("   Applying outlier removal...")
+        def remove_outliers_iqr(series, factor=1.5):
+            Q1 = series.quantile(0.25)
+            Q3 = series.quantile(0.75)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - factor * IQR
+            upper_bound = Q3 + factor * IQR
+            return (series >= lower_bound) & (series <= upper_bound)
+        
+        initial_count = len(df)
+        
+        # Apply to key columns
+        price_mask = remove_outliers_iqr(df['Price_in_Lakhs'].dropna())
+        area_mask = remove_outliers_iqr(df['Total_Area'].dropna())
+        pps_mask = remove_outliers_iqr(df['Price_per_SQFT'].dropna())
+        
+        # Combine masks
+        valid_price_idx = df['Price_in_Lakhs'].dropna().index
+        # Aligned on the priced rows: a row missing from any mask counts as an outlier
+        combined_mask = (price_mask & area_mask & pps_mask).reindex(valid_price_idx, fill_value=False)
+        outlier_idx = valid_price_idx[~combined_mask.to_numpy()]
+        
+        df = df.drop(outlier_idx)
+        
+        removed_count = initial_count - len(df)
+        print(f"     Removed {removed_count} outliers ({removed_count/initial_count*100:.1f}%)")
+        
+        result = (df, df['Price_in_Lakhs'].dropna(), top_localities)
+        self._training_cache = (weakref.ref(X, self._forget_training), result, set())
+        return result
+    
+    def _cached_training(self, X):
+        """Memoized _clean_training result for X, or None"""
+        cached = getattr(self, '_training_cache', None)
+        if cached is None or cached[0]() is not X:
+            return None
+        return cached[1]
+    
+    def _release_training(self, X, user):
+        """Record that fit or get_target is done with the memo for X; drop it once both are"""
+        cached = getattr(self, '_training_cache', None)
+        if cached is not None and cached[0]() is X:
+            cached[2].add(user)
+            if cached[2] >= {'fit', 'target'}:
+                self._training_cache = None
+    
+    def _forget_training(self, ref):
+        # X was garbage collected: its cleaned copy cannot be asked for again
+        cached = getattr(self, '_training_cache', None)
+        if cached is not None and cached[0] is ref:
+            self._training_cache = None
+    
+    def __getstate__(self):
+        # Never pickle the memoized training data into the model artifact
+        state = dict(super().__getstate__())
+        state.pop('_training_cache', None)
+        return state
+    
+    def _parse_prices_training(self, prices):
+        """Vectorized _parse_price_training: '₹1.2 Cr' -> 120.0, '85 L' -> 85.0, 8500000 -> 85.0"""
+        text = prices.astype(str).str.strip().str.replace('₹', '', regex=False).str.replace(',', '', regex=False)
+        numeric = pd.to_numeric(text.str.extract(r'([\d.]+)')[0], errors='coerce')
+        is_crore = text.str.contains('Cr', regex=False) | text.str.contains('cr', regex=False)
+        is_lakh = text.str.contains('L', regex=False) | text.str.contains('l', regex=False)
+        parsed = np.select(
+            [is_crore.to_numpy(), is_lakh.to_numpy()],
+            [numeric * 100, numeric],
+            default=numeric.where(numeric <= 10000, numeric / 100000)
+        )
+        return pd.Series(parsed, index=prices.index).where(prices.notna())
     
     def _parse_price_training(self, price_str):
         """Parse price from training dataset format"""
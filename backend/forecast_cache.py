@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+import numpy as np
+
+
+@dataclass
+class ForecastEntry:
+    """Forecast for one region, computed at `horizon` months, held as columns.
+
+    Months are datetime64[ns] arrays and values float64 arrays; to_records()
+    builds the default /forecast response shape and forecast_format.py the
+    columnar and Arrow ones.
+    """
+    horizon: int
+    history_month: np.ndarray
+    history_price: np.ndarray
+    forecast_month: np.ndarray
+    yhat: np.ndarray
+    yhat_lower: np.ndarray
+    yhat_upper: np.ndarray
+    last_training_date: str
+
+    def head(self, horizon: int) -> "ForecastEntry":
+        """The first `horizon` forecast months (array views, no copy)"""
+        return replace(self, horizon=horizon, forecast_month=self.forecast_month[:horizon],
+                       yhat=self.yhat[:horizon], yhat_lower=self.yhat_lower[:horizon],
+                       yhat_upper=self.yhat_upper[:horizon])
+
+    def to_records(self) -> Dict:
+        """One dict per month, the original /forecast response shape"""
+        history_months = np.datetime_as_string(self.history_month, unit="s").tolist()
+        forecast_months = np.datetime_as_string(self.forecast_month, unit="s").tolist()
+        return {
+            "historical": [
+                {"Month": month, "Historical Price": price}
+                for month, price in zip(history_months, self.history_price.tolist())
+            ],
+            "forecast": [
+                {"Month": month, "Forecasted Price": yhat, "Lower Bound": lower, "Upper Bound": upper}
+                for month, yhat, lower, upper in zip(
+                    forecast_months, self.yhat.tolist(), _nullable(self.yhat_lower), _nullable(self.yhat_upper)
+                )
+            ],
+            "last_training_date": self.last_training_date
+        }
+
+
+def _nullable(values: np.ndarray) -> list:
+    # Bounds are NaN when the forecast was made without uncertainty intervals
+    if np.isnan(values).any():
+        return [None if np.isnan(value) else value for value in values.tolist()]
+    return values.tolist()
+
+
+class ForecastCache:
+    """Bounded LRU of per-region forecasts.
+
+    One entry is kept per region and uncertainty mode, computed at the largest
+    horizon requested so far; shorter horizons are served by slicing its
+    forecast rows. Entries are tied to the model artifact version they were
+    computed from and are dropped as soon as a different version is seen.
+    """
+
+    def __init__(self, max_regions: int = 64):
+        self.max_regions = max_regions
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, region: str, horizon: int, version=None, uncertainty: str = "full") -> Optional[ForecastEntry]:
+        key = _key(region, uncertainty)
+        with self._lock:
+            if version != self.version:
+                self._reset(version)
+            entry = self._entries.get(key)
+            if entry is None or not 0 <= horizon <= entry.horizon:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.head(horizon)
+
+    def put(self, region: str, entry: ForecastEntry, version=None, uncertainty: str = "full"):
+        key = _key(region, uncertainty)
+        with self._lock:
+            if version != self.version:
+                self._reset(version)
+            current = self._entries.get(key)
+            if current is not None and current.horizon > entry.horizon:
+                # Keep the longer forecast so it can keep serving both horizons
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_regions:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version=None):
+        with self._lock:
+            self._reset(version)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_regions,
+                "regions": {region: entry.horizon for region, entry in self._entries.items()}
+            }
+
+    def _reset(self, version):
+        self._entries.clear()
+        self.version = version
+
+
+def _key(region: str, uncertainty: str) -> str:
+    # Each uncertainty mode has its own bounds; "full" keeps the plain region name
+    return region if uncertainty == "full" else f"{region} ({uncertainty})"
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Alternative /forecast response encodings.
+
+    records   (default) one object per month, as /forecast always returned
+    columnar  one array per column, encoded with orjson when installed:
+                {"historical": {"Month": [...], "Historical Price": [...]},
+                 "forecast": {"Month": [...], "Forecasted Price": [...],
+                              "Lower Bound": [...], "Upper Bound": [...]},
+                 "last_training_date": "..."}
+    arrow     Arrow IPC stream (needs pyarrow), one row per month:
+                Month, Historical Price, Forecasted Price, Lower Bound, Upper Bound
+              with nulls where a column does not apply, and the region and
+              last training date in the schema metadata
+
+Months in columnar and arrow output are ISO strings or, with months="epoch",
+integer seconds since 1970-01-01. Columnar and arrow bodies are gzipped when
+the client sends Accept-Encoding: gzip.
+"""
+import gzip
+import json
+from typing import Dict
+
+import numpy as np
+from fastapi import HTTPException, Response
+
+from forecast_cache import ForecastEntry
+
+try:
+    import orjson
+except ImportError:  # falls back to the standard library encoder
+    orjson = None
+
+FORMATS = ("records", "columnar", "arrow")
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# Smaller bodies are not worth the compression time
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+
+def _months(values: np.ndarray, months: str):
+    if months == "epoch":
+        return values.astype("datetime64[s]").astype(np.int64)
+    return np.datetime_as_string(values, unit="s").tolist()
+
+
+def columnar(entry: ForecastEntry, months: str = "iso") -> Dict:
+    """One array per column; values stay NumPy arrays for orjson to encode directly"""
+    return {
+        "historical": {
+            "Month": _months(entry.history_month, months),
+            "Historical Price": np.asarray(entry.history_price)
+        },
+        "forecast": {
+            "Month": _months(entry.forecast_month, months),
+            "Forecasted Price": np.asarray(entry.yhat),
+            "Lower Bound": np.asarray(entry.yhat_lower),
+            "Upper Bound": np.asarray(entry.yhat_upper)
+        },
+        "last_training_date": entry.last_training_date
+    }
+
+
+def encode_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    # NaN (bounds of a forecast made without intervals) is null, as orjson writes it
+    return json.dumps(payload, default=lambda value: [None if v != v else v for v in value.tolist()],
+                      separators=(",", ":")).encode()
+
+
+def arrow_ipc(entry: ForecastEntry, region: str, months: str = "iso") -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Arrow output requires pyarrow (pip install pyarrow)")
+
+    n_history, n_forecast = len(entry.history_month), len(entry.forecast_month)
+    month = np.concatenate([entry.history_month, entry.forecast_month]).astype("datetime64[s]")
+    history_rows = np.arange(n_history + n_forecast) < n_history
+
+    def column(values, in_history):
+        padded = np.empty(n_history + n_forecast, dtype=np.float64)
+        mask = ~history_rows if in_history else history_rows
+        padded[~mask] = values
+        return pa.array(padded, mask=mask | np.isnan(padded))
+
+    table = pa.table({
+        "Month": pa.array(month.astype(np.int64), pa.int64()) if months == "epoch" else pa.array(month),
+        "Historical Price": column(entry.history_price, True),
+        "Forecasted Price": column(entry.yhat, False),
+        "Lower Bound": column(entry.yhat_lower, False),
+        "Upper Bound": column(entry.yhat_upper, False),
+    }).replace_schema_metadata({"region": region, "last_training_date": entry.last_training_date})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def forecast_response(entry: ForecastEntry, region: str, fmt: str = "records", months: str = "iso",
+                      accept_encoding: str = ""):
+    """The /forecast body in the requested format; records stay a dict for FastAPI to encode"""
+    if fmt == "records":
+        return entry.to_records()
+    if fmt == "columnar":
+        body, media_type = encode_json(columnar(entry, months)), "application/json"
+    elif fmt == "arrow":
+        body, media_type = arrow_ipc(entry, region, months), ARROW_MEDIA_TYPE
+    else:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in accept_encoding and len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
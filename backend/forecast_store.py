@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Precomputed forecast store for serving /forecast without Prophet.
+
+The store is a directory of flat NumPy arrays plus a JSON region index:
+
+    index.json                  region -> offsets/lengths into the arrays
+    history_ds.<build>.npy      datetime64[ns]   history months, all regions
+    history_y.<build>.npy       float64          historical prices
+    forecast_ds.<build>.npy     datetime64[ns]   forecast months
+    yhat.<build>.npy            float64          forecast
+    yhat_lower.<build>.npy      float64          lower bound
+    yhat_upper.<build>.npy      float64          upper bound
+
+Readers open the arrays with mmap_mode="r", so every worker shares the same
+pages through the OS page cache and a request is a pair of slices. A rebuild
+writes new array files first and swaps index.json atomically, so readers
+never see a half-written store. The previous build's arrays are kept until
+the next rebuild, for readers that opened its index just before the swap.
+
+Build it offline:
+
+    cd backend
+    python forecast_store.py --models ../Models/all_region_models.joblib \
+        --out ../Models/forecast_store --max-horizon 36
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from forecast_cache import ForecastEntry
+from forecasting import compute_forecast
+from region_models import load_region_models
+
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+ARRAY_NAMES = ["history_ds", "history_y", "forecast_ds", "yhat", "yhat_lower", "yhat_upper"]
+
+
+def build_forecast_store(models: Dict, out_dir: str, max_horizon: int = 36, source: str = None) -> Dict:
+    """Forecast every region up to max_horizon months and write the store to out_dir"""
+    os.makedirs(out_dir, exist_ok=True)
+    columns = {name: [] for name in ARRAY_NAMES}
+    regions = {}
+    history_offset = 0
+    forecast_offset = 0
+
+    for region, model in models.items():
+        entry = compute_forecast(model, max_horizon)
+
+        columns["history_ds"].append(entry.history_month)
+        columns["history_y"].append(entry.history_price)
+        columns["forecast_ds"].append(entry.forecast_month)
+        columns["yhat"].append(entry.yhat)
+        columns["yhat_lower"].append(entry.yhat_lower)
+        columns["yhat_upper"].append(entry.yhat_upper)
+
+        regions[region] = {
+            "history_offset": history_offset,
+            "history_length": len(entry.history_month),
+            "forecast_offset": forecast_offset,
+            "forecast_length": len(entry.forecast_month),
+            "last_training_date": entry.last_training_date
+        }
+        history_offset += len(entry.history_month)
+        forecast_offset += len(entry.forecast_month)
+        print(f" Forecasted {region}")
+
+    build_id = time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}"
+    existing = set(os.listdir(out_dir))
+    suffix = 1
+    while f"{ARRAY_NAMES[0]}.{build_id}.npy" in existing:
+        # Never overwrite the live or the previous build's arrays
+        suffix += 1
+        build_id = time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}_{suffix}"
+    files = {}
+    for name, parts in columns.items():
+        dtype = "datetime64[ns]" if name.endswith("_ds") else np.float64
+        array = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        files[name] = f"{name}.{build_id}.npy"
+        np.save(os.path.join(out_dir, files[name]), array)
+
+    index = {
+        "format_version": FORMAT_VERSION,
+        "build_id": build_id,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": source,
+        "max_horizon": max_horizon,
+        "files": files,
+        "regions": regions
+    }
+    index_path = os.path.join(out_dir, INDEX_FILE)
+    previous_files = set()
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            previous_files = set(json.load(f).get("files", {}).values())
+    tmp_path = os.path.join(out_dir, f".{INDEX_FILE}.{build_id}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    # The build just replaced stays for readers that read its index before the swap;
+    # builds older than that go (one still mapped on Windows is retried next time)
+    keep = set(files.values()) | previous_files
+    for filename in os.listdir(out_dir):
+        if filename.endswith(".npy") and filename not in keep:
+            try:
+                os.remove(os.path.join(out_dir, filename))
+            except OSError:
+                pass
+    return index
+
+
+class ForecastStore:
+    """Read-only, memory-mapped view of a forecast store directory"""
+
+    def __init__(self, path: str):
+        self.path = path
+        index_path = os.path.join(path, INDEX_FILE)
+        self.version = os.stat(index_path).st_mtime_ns
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forecast store format: {index.get('format_version')}")
+        self.build_id = index["build_id"]
+        self.max_horizon = index["max_horizon"]
+        self.regions = index["regions"]
+        self.arrays = {
+            name: np.load(os.path.join(path, filename), mmap_mode="r")
+            for name, filename in index["files"].items()
+        }
+
+    def is_stale(self) -> bool:
+        """True when index.json was replaced by a newer build"""
+        return os.stat(os.path.join(self.path, INDEX_FILE)).st_mtime_ns != self.version
+
+    def available_regions(self) -> List[str]:
+        return list(self.regions.keys())
+
+    def entry(self, region: str, horizon: int) -> ForecastEntry:
+        """A region's history and first `horizon` forecast months as views into the mapped arrays"""
+        entry = self.regions[region]
+        if not 0 <= horizon <= self.max_horizon:
+            raise ValueError(f"horizon must be between 0 and {self.max_horizon}")
+
+        history = slice(entry["history_offset"], entry["history_offset"] + entry["history_length"])
+        start = entry["forecast_offset"]
+        forecast = slice(start, start + min(horizon, entry["forecast_length"]))
+        return ForecastEntry(
+            horizon=horizon,
+            history_month=self.arrays["history_ds"][history],
+            history_price=self.arrays["history_y"][history],
+            forecast_month=self.arrays["forecast_ds"][forecast],
+            yhat=self.arrays["yhat"][forecast],
+            yhat_lower=self.arrays["yhat_lower"][forecast],
+            yhat_upper=self.arrays["yhat_upper"][forecast],
+            last_training_date=entry["last_training_date"]
+        )
+
+    def forecast(self, region: str, horizon: int) -> Dict:
+        """Same response shape as the live /forecast route, sliced from the store"""
+        return self.entry(region, horizon).to_records()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute every region's forecast into a memory-mappable store")
+    parser.add_argument("--models", required=True, help="all_region_models.joblib or a per-region model directory")
+    parser.add_argument("--out", required=True, help="Output store directory")
+    parser.add_argument("--max-horizon", type=int, default=36, help="Months to forecast per region (default: 36)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    models = load_region_models(args.models)
+    index = build_forecast_store(models, args.out, args.max_horizon, source=os.path.abspath(args.models))
+    print(f" Forecast store written: {len(index['regions'])} regions, "
+          f"horizon {args.max_horizon}, {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Prophet forecast computation, importable on its own by pool workers"""
+import os
+
+import numpy as np
+
+from analytic_forecast import analytic_forecast, supports, with_samples
+from forecast_cache import ForecastEntry
+from metrics import stage
+from region_models import artifact_version, load_region_models
+
+# Simulated futures per interval with uncertainty="reduced" (Prophet's default is 1000)
+REDUCED_UNCERTAINTY_SAMPLES = int(os.environ.get("FORECAST_REDUCED_SAMPLES", "100"))
+
+
+def compute_forecast(model, horizon: int, uncertainty: str = "full") -> ForecastEntry:
+    """Run Prophet for one region and return its history and forecast columns.
+
+    `uncertainty` picks how yhat_lower/yhat_upper are computed: "full" samples
+    the model's own uncertainty_samples futures, "reduced" at most
+    REDUCED_UNCERTAINTY_SAMPLES, "none" skips the intervals (bounds are NaN)
+    and "analytic" evaluates the fitted parameters in closed form (see
+    analytic_forecast.py), falling back to "full" for models it does not cover.
+    """
+    if isinstance(model, dict):  # Handle dict inside dict case
+        model = list(model.values())[0]
+
+    last_training_date = model.history["ds"].max()
+    with stage("make_future_dataframe"):
+        # Only the forecast months are returned, so the history is not predicted again
+        future = model.make_future_dataframe(periods=horizon, freq="ME", include_history=False)
+
+    if len(future) == 0:
+        yhat = yhat_lower = yhat_upper = np.empty(0)
+    elif uncertainty == "analytic" and supports(model):
+        with stage("analytic_predict"):
+            yhat, yhat_lower, yhat_upper = analytic_forecast(model, future["ds"].to_numpy())
+    else:
+        if uncertainty == "reduced":
+            model = with_samples(model, min(model.uncertainty_samples, REDUCED_UNCERTAINTY_SAMPLES))
+        elif uncertainty == "none":
+            model = with_samples(model, 0)
+        with stage("prophet_predict"):
+            forecast = model.predict(future)
+        yhat = forecast["yhat"].to_numpy(dtype=np.float64)
+        if "yhat_lower" in forecast:
+            yhat_lower = forecast["yhat_lower"].to_numpy(dtype=np.float64)
+            yhat_upper = forecast["yhat_upper"].to_numpy(dtype=np.float64)
+        else:
+            yhat_lower, yhat_upper = np.full(len(yhat), np.nan), np.full(len(yhat), np.nan)
+
+    return ForecastEntry(
+        horizon=horizon,
+        history_month=model.history["ds"].to_numpy(dtype="datetime64[ns]"),
+        history_price=model.history["y"].to_numpy(dtype=np.float64),
+        forecast_month=future["ds"].to_numpy(dtype="datetime64[ns]"),
+        yhat=yhat,
+        yhat_lower=yhat_lower,
+        yhat_upper=yhat_upper,
+        last_training_date=last_training_date.isoformat()
+    )
+
+
+def compute_region_forecast(models, region: str, horizon: int, uncertainty: str = "full") -> ForecastEntry:
+    """Look up (and lazily load) a region's model off the event loop, then forecast it"""
+    return compute_forecast(models[region], horizon, uncertainty)
+
+
+# ----------------------------
+# Process pool workers
+# ----------------------------
+_worker_models = None
+_worker_models_path = None
+_worker_max_loaded = 16
+_worker_mmap = False
+_worker_version = None
+
+
+def init_forecast_worker(models_path: str, max_loaded: int = 16, mmap: bool = False):
+    """Pool initializer: load the region models once per worker process"""
+    global _worker_models, _worker_models_path, _worker_max_loaded, _worker_mmap, _worker_version
+    _worker_models_path = models_path
+    _worker_max_loaded = max_loaded
+    _worker_mmap = mmap
+    _worker_version = artifact_version(models_path)
+    _worker_models = load_region_models(models_path, max_loaded=max_loaded, mmap=mmap)
+
+
+def forecast_region(region: str, horizon: int, uncertainty: str = "full") -> ForecastEntry:
+    """Forecast a region with this worker's models, reloading them if the artifact changed"""
+    global _worker_models, _worker_version
+    version = artifact_version(_worker_models_path)
+    if version != _worker_version:
+        _worker_models = load_region_models(_worker_models_path, max_loaded=_worker_max_loaded, mmap=_worker_mmap)
+        _worker_version = version
+    return compute_forecast(_worker_models[region], horizon, uncertainty)
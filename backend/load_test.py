@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""Load test of one API worker: throughput and latency percentiles under rising concurrency.
+
+Starts main.py on uvicorn (one worker, 127.0.0.1, a free port) with the
+bundled Models/ artifacts, waits for /ready, and drives it from asyncio with
+a weighted mix of requests. No network access is needed; the HTTP client is
+a minimal keep-alive HTTP/1.1 client on asyncio streams.
+
+    cd backend
+    python load_test.py --concurrency 1 4 16 64 --stage-seconds 20 --out load_test.json
+    python load_test.py --mix predict_price=6 predict_price_batch=1 forecast=3 \
+        --batch-sizes 10 100 --regions Alaska Texas --horizons 12 36
+
+Request kinds in --mix (name=weight):
+
+    predict_price         POST /predict_price, one random property
+    predict_price_batch   POST /predict_price_batch, a batch size from --batch-sizes
+    forecast              POST /forecast, a region from --regions (default: the
+                          first 10 available) and a horizon from --horizons
+
+Every stage keeps `concurrency` clients busy for --stage-seconds, each sending
+its next request as soon as the previous answer is read (closed loop), after
+--warmup-seconds at the first stage's concurrency that are not recorded. For
+each stage and kind the report has throughput, p50/p95/p99/max latency, the
+status codes (429/503 are the pools shedding load) and a latency histogram.
+The text report goes to stdout (progress to stderr) and, with --out, the
+full results are written as JSON.
+
+Environment variables read by main.py (PRICE_PREDICTOR, FORECAST_POOL_PROCESSES,
+PRICE_CACHE_SIZE, ...) are passed to the server. Client and server share the
+machine, so on few cores the client's own CPU use lowers the numbers; --url
+drives a server started elsewhere instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmark import percentile
+from metrics import DEFAULT_BUCKETS
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+KINDS = ("predict_price", "predict_price_batch", "forecast")
+# Settings that change what is measured; recorded with the results
+RECORDED_ENV = ["PRICE_PREDICTOR", "PRICE_CACHE_SIZE", "PRICE_POOL_WORKERS", "FORECAST_POOL_WORKERS",
+                "FORECAST_POOL_PROCESSES", "FORECAST_MODE", "FORECAST_COALESCE", "MODEL_MMAP",
+                "TS_MODELS_PATH", "REAL_ESTATE_MODEL_DIR"]
+HISTOGRAM_BUCKETS_MS = tuple(bound * 1000 for bound in DEFAULT_BUCKETS)
+LOCATIONS = [("Whitefield, Bangalore", "Bangalore"), ("Andheri West", "Mumbai"), ("Wagholi", "Pune"),
+             ("Avadi, Chennai", "Chennai"), ("Sector 12 Dwarka", "New Delhi"), ("Gachibowli", "Hyderabad")]
+
+
+# ----------------------------
+# HTTP client
+# ----------------------------
+class Connection:
+    """One keep-alive HTTP/1.1 connection; enough of the protocol for this API"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, payload=None) -> Tuple[int, bytes]:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode()
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            self.writer.write(head + body)
+            await self.writer.drain()
+            return await self._read_response()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            raise
+
+    async def _read_response(self) -> Tuple[int, bytes]:
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                chunks.append(await self.reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            body = b"".join(chunk[:-2] for chunk in chunks)
+        else:
+            body = await self.reader.read()
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+# ----------------------------
+# Traffic
+# ----------------------------
+def random_property(rng: random.Random) -> Dict:
+    location, city = rng.choice(LOCATIONS)
+    bhk = rng.randint(1, 5)
+    return {
+        "Location": location, "City": city, "BHK": bhk,
+        "Total_Area": round(rng.uniform(350, 600) * bhk, 1),
+        "Price_per_SQFT": round(rng.uniform(3000, 25000), 1),
+        "Bathroom": max(1, bhk - rng.randint(0, 1)),
+        "Balcony": rng.choice([True, False, None])
+    }
+
+
+class TrafficMix:
+    """Weighted choice of the next request: (kind, path, payload)"""
+
+    def __init__(self, weights: Dict[str, float], batch_sizes: List[int], regions: List[str],
+                 horizons: List[int], uncertainty: str, seed: int = 0):
+        self.kinds = [kind for kind in KINDS if weights.get(kind, 0) > 0]
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.batch_sizes = batch_sizes
+        self.regions = regions
+        self.horizons = horizons
+        self.uncertainty = uncertainty
+        self.rng = random.Random(seed)
+
+    def next(self) -> Tuple[str, str, Dict]:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "predict_price":
+            return kind, "/predict_price", random_property(self.rng)
+        if kind == "predict_price_batch":
+            size = self.rng.choice(self.batch_sizes)
+            return kind, "/predict_price_batch", {"properties": [random_property(self.rng) for _ in range(size)]}
+        return kind, "/forecast", {"region": self.rng.choice(self.regions), "horizon": self.rng.choice(self.horizons),
+                                   "uncertainty": self.uncertainty}
+
+
+async def run_stage(host: str, port: int, mix: TrafficMix, concurrency: int, seconds: float) -> List[Tuple]:
+    """(kind, status, seconds) for every request finished within the stage"""
+    samples = []
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        connection = Connection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                kind, path, payload = mix.next()
+                start = time.perf_counter()
+                try:
+                    status, _ = await connection.request("POST", path, payload)
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    status = 0  # connection failed or the response was malformed
+                samples.append((kind, status, time.perf_counter() - start))
+        finally:
+            connection.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return samples
+
+
+def summarize(samples: List[Tuple], seconds: float) -> Dict:
+    """Throughput, percentiles of successful requests and status counts for one set of samples"""
+    ok_ms = [latency * 1000 for _, status, latency in samples if 200 <= status < 300]
+    summary = {
+        "requests": len(samples),
+        "ok": len(ok_ms),
+        "throughput_rps": round(len(ok_ms) / seconds, 2),
+        "status": {str(status): count for status, count in sorted(Counter(s for _, s, _ in samples).items())}
+    }
+    if ok_ms:
+        histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for ms in ok_ms:
+            histogram[next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if ms <= bound), -1)] += 1
+        summary.update({
+            "p50_ms": round(statistics.median(ok_ms), 2),
+            "p95_ms": round(percentile(ok_ms, 95), 2),
+            "p99_ms": round(percentile(ok_ms, 99), 2),
+            "max_ms": round(max(ok_ms), 2),
+            "mean_ms": round(statistics.mean(ok_ms), 2),
+            # Non-cumulative counts per upper bound in ms, the last one unbounded
+            "histogram_ms": {**{f"{bound:g}": n for bound, n in zip(HISTOGRAM_BUCKETS_MS, histogram)},
+                             "+Inf": histogram[-1]}
+        })
+    return summary
+
+
+async def run_load_test(host: str, port: int, mix: TrafficMix, concurrency: List[int], stage_seconds: float,
+                        warmup_seconds: float) -> List[Dict]:
+    if warmup_seconds > 0:
+        await run_stage(host, port, mix, concurrency[0], warmup_seconds)
+    stages = []
+    for level in concurrency:
+        start = time.perf_counter()
+        samples = await run_stage(host, port, mix, level, stage_seconds)
+        elapsed = time.perf_counter() - start
+        by_kind = defaultdict(list)
+        for sample in samples:
+            by_kind[sample[0]].append(sample)
+        stage = {"concurrency": level, "seconds": round(elapsed, 2), "all": summarize(samples, elapsed),
+                 "kinds": {kind: summarize(by_kind[kind], elapsed) for kind in mix.kinds if by_kind[kind]}}
+        stages.append(stage)
+        print(f" concurrency {level}: {stage['all']['throughput_rps']} req/s, "
+              f"p99 {stage['all'].get('p99_ms', '-')} ms", file=sys.stderr)
+    return stages
+
+
+# ----------------------------
+# Server
+# ----------------------------
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def get_once(host: str, port: int, path: str) -> Tuple[int, bytes]:
+    """One GET on a connection of its own, closed afterwards"""
+    connection = Connection(host, port)
+    try:
+        return await connection.request("GET", path)
+    finally:
+        connection.close()
+
+
+def start_server(port: int, log_path: str, timeout: float) -> subprocess.Popen:
+    """uvicorn main:app in a child process, returned once /ready answers"""
+    with open(log_path, "w") as log:  # the child keeps its own handle
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", "1", "--no-access-log", "--log-level", "warning"],
+            cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}; see {log_path}")
+        try:
+            status, _ = asyncio.run(get_once("127.0.0.1", port, "/ready"))
+            if status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError(f"server not ready after {timeout:.0f}s; see {log_path}")
+
+
+def available_regions(host: str, port: int, limit: int) -> List[str]:
+    status, body = asyncio.run(get_once(host, port, "/available_regions"))
+    if status != 200:
+        raise RuntimeError(f"/available_regions answered {status}")
+    return json.loads(body)["regions"][:limit]
+
+
+# ----------------------------
+# Report
+# ----------------------------
+def text_report(results: Dict) -> str:
+    lines = [f" {results['target']}, mix {results['mix']}, {results['stage_seconds']}s per stage",
+             f" {'conc':>5} {'kind':<20} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  status"]
+    for stage in results["stages"]:
+        for kind, summary in [("all", stage["all"])] + list(stage["kinds"].items()):
+            status = " ".join(f"{code}:{count}" for code, count in summary["status"].items())
+            lines.append(f" {stage['concurrency']:>5} {kind:<20} {summary['throughput_rps']:>9.1f} "
+                         f"{summary.get('p50_ms', float('nan')):>9.1f} {summary.get('p95_ms', float('nan')):>9.1f} "
+                         f"{summary.get('p99_ms', float('nan')):>9.1f} {summary.get('max_ms', float('nan')):>9.1f}  {status}")
+    lines.append("")
+    lines.append(" Latency histogram, all successful requests (ms upper bound: count per stage concurrency)")
+    buckets = list(results["stages"][0]["all"].get("histogram_ms", {}))
+    lines.append(f" {'<= ms':>8} " + " ".join(f"{stage['concurrency']:>8}" for stage in results["stages"]))
+    for bucket in buckets:
+        counts = [stage["all"].get("histogram_ms", {}).get(bucket, 0) for stage in results["stages"]]
+        if any(counts):
+            lines.append(f" {bucket:>8} " + " ".join(f"{count:>8}" for count in counts))
+    return "\n".join(lines)
+
+
+def parse_mix(items: List[str]) -> Dict[str, float]:
+    weights = {}
+    for item in items:
+        kind, _, weight = item.partition("=")
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}; expected one of {', '.join(KINDS)}")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", nargs="+", default=["predict_price=7", "predict_price_batch=1", "forecast=2"],
+                        help="Request kinds and weights (default: predict_price=7 predict_price_batch=1 forecast=2)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64],
+                        help="Concurrent clients per stage, in order (default: 1 4 16 64)")
+    parser.add_argument("--stage-seconds", type=float, default=15, help="Duration of each stage (default: 15)")
+    parser.add_argument("--warmup-seconds", type=float, default=3, help="Unrecorded traffic before the first stage")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[10, 100], help="Sizes for predict_price_batch")
+    parser.add_argument("--regions", nargs="+", default=None, help="Forecast regions (default: first 10 available)")
+    parser.add_argument("--horizons", nargs="+", type=int, default=[12, 36], help="Forecast horizons in months")
+    parser.add_argument("--uncertainty", default="full", help="Forecast uncertainty mode (default: full)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the traffic generator")
+    parser.add_argument("--url", default=None, help="Drive a running server instead of starting one")
+    parser.add_argument("--startup-timeout", type=float, default=120, help="Seconds to wait for /ready")
+    parser.add_argument("--server-log", default=os.path.join(tempfile.gettempdir(), "realtyai_load_test_server.log"),
+                        help="Where the started server's output goes")
+    parser.add_argument("--out", default=None, help="Write the results JSON here")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    server: Optional[subprocess.Popen] = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        print(f" Starting uvicorn main:app on {host}:{port}...", file=sys.stderr)
+        server = start_server(port, args.server_log, args.startup_timeout)
+    try:
+        regions = args.regions or available_regions(host, port, 10)
+        mix = TrafficMix(weights, args.batch_sizes, regions, args.horizons, args.uncertainty, args.seed)
+        stages = asyncio.run(run_load_test(host, port, mix, args.concurrency, args.stage_seconds,
+                                           args.warmup_seconds))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {name: os.environ[name] for name in RECORDED_ENV if name in os.environ},
+        "target": f"http://{host}:{port}" + ("" if args.url else " (started by load_test.py)"),
+        "mix": weights,
+        "batch_sizes": args.batch_sizes,
+        "regions": regions,
+        "horizons": args.horizons,
+        "uncertainty": args.uncertainty,
+        "stage_seconds": args.stage_seconds,
+        "stages": stages
+    }
+    print(text_report(results))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f" Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Per-stage latency histograms, request metrics and an opt-in sampling profiler.
+
+Everything is exported in the Prometheus text format by render() (served on
+/metrics), without a client library:
+
+    realtyai_stage_seconds{stage}               histogram; parse, transform, predict,
+                                                make_future_dataframe, prophet_predict, serialize
+    realtyai_request_seconds{route}             histogram of whole requests
+    realtyai_requests_total{route,method,status}
+    realtyai_model_load_seconds{model}          histogram of model (re)loads
+    anything registered with add_collector()    e.g. cache and pool stats
+
+Timing a stage is `with stage("transform"): ...`. With METRICS_ENABLED=0 that
+is a shared no-op context manager and MetricsMiddleware is not installed, so
+the cost of the instrumentation when off is one attribute lookup per stage.
+
+The profiler samples every thread's stack with sys._current_frames while a
+request carrying `X-Profile: 1` runs (only with PROFILER_ENABLED=1) and writes
+the collapsed stacks - one `frame;frame;frame count` line per stack, the
+input format of flamegraph.pl and speedscope - to PROFILE_DIR. A request's
+work is spread over the event loop and the pool threads, which also run
+other requests, so the sampler cannot tell whose work a stack is: under
+concurrent load the profile mixes in other requests, and work done in
+forecast worker processes is not sampled at all. Profile on an otherwise
+idle worker for a clean picture.
+"""
+import asyncio
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "0") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_HEADER = b"x-profile"
+
+# Seconds; spans sub-millisecond stages up to multi-second batch requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Set by MetricsMiddleware so handlers can time the parse stage
+_request_start = contextvars.ContextVar("request_start", default=None)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CounterMetric:
+    """Monotonic counter keyed by label values"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("realtyai_stage_seconds", "Time spent in one inference stage", ("stage",))
+REQUEST_SECONDS = Histogram("realtyai_request_seconds", "Whole request latency", ("route",))
+REQUESTS_TOTAL = CounterMetric("realtyai_requests_total", "Requests served", ("route", "method", "status"))
+MODEL_LOAD_SECONDS = Histogram("realtyai_model_load_seconds", "Time to load a model artifact", ("model",),
+                               buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+_METRICS = [STAGE_SECONDS, REQUEST_SECONDS, REQUESTS_TOTAL, MODEL_LOAD_SECONDS]
+
+# name -> (type, help, callable returning [(labels dict, value)])
+_collectors: Dict[str, Tuple[str, str, Callable[[], Iterable[Tuple[Dict, float]]]]] = {}
+
+
+def add_collector(name: str, help_text: str, collect: Callable[[], Iterable[Tuple[Dict, float]]], kind: str = "gauge"):
+    """Export values computed at scrape time (cache sizes, hit counts, pool depth, ...)"""
+    _collectors[name] = (kind, help_text, collect)
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.name)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager timing one stage into realtyai_stage_seconds"""
+    if not METRICS_ENABLED:
+        return _NO_STAGE
+    return _Stage(name)
+
+
+def mark_parsed():
+    """Record the parse stage: from the request reaching the app to the handler running"""
+    start = _request_start.get()
+    if start is not None:
+        STAGE_SECONDS.observe(time.perf_counter() - start, "parse")
+
+
+def record_model_load(model: str, seconds: float):
+    if METRICS_ENABLED:
+        MODEL_LOAD_SECONDS.observe(seconds, model)
+
+
+def render() -> str:
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for name, (kind, help_text, collect) in sorted(_collectors.items()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        try:
+            samples = list(collect())
+        except Exception:
+            continue
+        for labels, value in samples:
+            if value is None:
+                continue
+            names = tuple(labels)
+            lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {float(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# Sampling profiler
+# ----------------------------
+# Innermost frames of threads that are idle (pool workers waiting for work, the event loop selecting)
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    # concurrent.futures workers block in the C-level SimpleQueue.get, so _worker is innermost
+    return code.co_filename.endswith(_IDLE_FILES) or (code.co_name == "_worker" and code.co_filename.endswith("thread.py"))
+
+
+class SamplingProfiler:
+    """Collapsed-stack sampler over all threads, run for the duration of one request"""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, route: str) -> Optional[str]:
+        if not self.samples:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}{route.replace('/', '_')}.txt"
+        path = os.path.join(PROFILE_DIR, name)
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+# ----------------------------
+# ASGI middleware
+# ----------------------------
+class MetricsMiddleware:
+    """Counts and times every HTTP request; profiles it when asked to"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _request_start.set(start)
+        status = [500]
+        profiler = None
+        if PROFILER_ENABLED and dict(scope.get("headers") or ()).get(PROFILE_HEADER) == b"1":
+            profiler = SamplingProfiler().start()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if profiler is not None:
+                    # Sampling stops when the handler is done; serialization of the body is excluded
+                    # Joining the sampler and writing the file stay off the event loop
+                    route = _route_label(scope)
+                    samples = await asyncio.to_thread(profiler.stop)
+                    path = await asyncio.to_thread(profiler.write, route) if samples else None
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"x-profile-samples", str(sum(profiler.samples.values())).encode()),
+                        (b"x-profile-file", (path or "").encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_start.reset(token)
+            if profiler is not None and not profiler._stop.is_set():
+                await asyncio.to_thread(profiler.stop)
+            route = _route_label(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route)
+            REQUESTS_TOTAL.inc(route, scope.get("method", ""), str(status[0]))
+
+
+def _route_label(scope) -> str:
+    # The matched route template keeps label cardinality bounded; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
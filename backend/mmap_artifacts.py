@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Model artifacts laid out for memory-mapped loading, and their footprint per worker.
+
+Every API process and forecast worker unpickles its own copy of the price
+pipeline and the region models. Written uncompressed, joblib keeps each
+large NumPy array as a raw block that joblib.load(mmap_mode="r") maps
+instead of copying, so those pages live once in the OS page cache and are
+shared by every process that opens the file. Export once:
+
+    cd backend
+    python mmap_artifacts.py --models ../Models/all_region_models.joblib \
+        --models-out ../Models/all_region_models.mmap.joblib \
+        --pipeline ../Models/real_estate_pipeline_v20250915_182141.joblib \
+        --pipeline-out ../Models/mmap
+
+then start the API with MODEL_MMAP=1, TS_MODELS_PATH and
+REAL_ESTATE_MODEL_DIR pointing at the exported files.
+
+The export also drops each Prophet model's stan_backend and stan_fit: the
+CmdStan state from fitting, which predict() never reads and which is most of
+a pickled region model. What cannot be shared:
+
+  * sklearn Tree nodes: Tree.__setstate__ copies the node and value arrays
+    into memory it owns, so the forest is private in every process however
+    it is loaded
+  * the encoders' classes_ and the feature engineer's tables: object arrays
+    and Python containers, which mmap_mode leaves to pickle
+  * CompiledPredictor's Python lists (PRICE_PREDICTOR=compiled): the
+    single-row walk over NumPy or memoryview indexing is twice as slow
+
+--measure N loads each layout in N fresh worker processes, then scores a
+price and forecasts every region, and prints the private (RssAnon) and
+file-backed, shareable (RssFile) memory each worker gained over its imports
+after loading and after use.
+"""
+import argparse
+import copy
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+import joblib
+
+from region_models import load_region_models, region_filename, write_manifest, write_region_model
+
+# Fitting state that Prophet.predict never reads
+PROPHET_FIT_ATTRIBUTES = ("stan_backend", "stan_fit")
+SAMPLE_PROPERTY = {
+    "Location": "Whitefield, Bangalore", "City": "Bangalore", "BHK": 3, "Total_Area": 1200.0,
+    "Price_per_SQFT": 6500.0, "Bathroom": 2, "Balcony": "Yes"
+}
+
+
+def serving_copy(model):
+    """Shallow copy of a fitted Prophet model without its fitting state"""
+    if isinstance(model, dict):  # Handle dict inside dict case
+        model = list(model.values())[0]
+    model = copy.copy(model)
+    for name in PROPHET_FIT_ATTRIBUTES:
+        if hasattr(model, name):
+            setattr(model, name, None)
+    return model
+
+
+def export_region_models(models_path: str, out_path: str) -> int:
+    """Write uncompressed, fit-state-free region models; a directory out_path gets the per-region layout"""
+    models = load_region_models(models_path)
+    if out_path.endswith(".joblib"):
+        directory = os.path.dirname(os.path.abspath(out_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{os.path.basename(out_path)}.tmp")
+        joblib.dump({region: serving_copy(models[region]) for region in models}, tmp_path)
+        os.replace(tmp_path, out_path)
+    else:
+        os.makedirs(out_path, exist_ok=True)
+        taken = set()
+        regions = {region: write_region_model(out_path, region_filename(region, taken), serving_copy(models[region]))
+                   for region in models}
+        write_manifest(out_path, regions, models_path)
+    return len(models)
+
+
+def export_pipeline(pipeline_path: str, out_path: str) -> str:
+    """Rewrite a price pipeline uncompressed; a directory out_path keeps the file name the registry looks for"""
+    if os.path.isdir(out_path) or not out_path.endswith(".joblib"):
+        os.makedirs(out_path, exist_ok=True)
+        out_path = os.path.join(out_path, os.path.basename(pipeline_path))
+    pipeline = joblib.load(pipeline_path)
+    tmp_path = out_path + ".tmp"
+    joblib.dump(pipeline, tmp_path, compress=0)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+# ----------------------------
+# Per-worker footprint
+# ----------------------------
+def _memory() -> Dict[str, float]:
+    """RssAnon and RssFile of this process in MB (Linux)"""
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                name, kb = line.split()[:2]
+                memory[name.rstrip(":")] = int(kb) / 1024
+    return memory
+
+
+def _worker_footprint(models_path: str, pipeline_path: str, mmap: bool, horizon: int) -> Dict[str, float]:
+    """Pool task: load both artifacts, then use them once; MB this process gained at each step"""
+    # Everything unpickling imports is imported before the baseline, as it is in the API
+    import pandas as pd
+    import prophet  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+    import feature_engineering  # noqa: F401
+    from forecasting import compute_forecast
+    from model_registry import predict_pipeline
+
+    mmap_mode = "r" if mmap else None
+    before = _memory()
+    pipeline = joblib.load(pipeline_path, mmap_mode=mmap_mode)
+    models = load_region_models(models_path, max_loaded=10 ** 6, mmap=mmap)
+    models = {region: models[region] for region in models}
+    loaded = _memory()
+    predict_pipeline(pipeline, pd.DataFrame([SAMPLE_PROPERTY]))
+    for region in models:
+        compute_forecast(models[region], horizon)
+    used = _memory()
+    footprint = {f"load {name}": loaded[name] - before[name] for name in before}
+    footprint.update({f"use {name}": used[name] - before[name] for name in before})
+    return footprint
+
+
+def measure(layouts: Dict[str, tuple], workers: int, horizon: int) -> Dict[str, Dict[str, float]]:
+    """Median footprint per worker for each (models_path, pipeline_path, mmap) layout"""
+    results = {}
+    for name, (models_path, pipeline_path, mmap) in layouts.items():
+        # One task per fresh process: a reused worker would report what its allocator kept from the last load
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 max_tasks_per_child=1) as pool:
+            samples = list(pool.map(_worker_footprint, [models_path] * workers, [pipeline_path] * workers,
+                                    [mmap] * workers, [horizon] * workers))
+        results[name] = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", default=os.path.join("..", "Models", "all_region_models.joblib"),
+                        help="Region models artifact: dict-of-models file or region directory")
+    parser.add_argument("--models-out", default=None,
+                        help="Exported region models (.joblib file, otherwise a region directory)")
+    parser.add_argument("--pipeline", default=None, help="Price pipeline file (real_estate_pipeline_v*.joblib)")
+    parser.add_argument("--pipeline-out", default=None, help="Exported pipeline file or directory")
+    parser.add_argument("--measure", type=int, default=0, metavar="N",
+                        help="Compare the memory N workers gain with the original and exported artifacts")
+    parser.add_argument("--horizon", type=int, default=36, help="Forecast months while measuring (default: 36)")
+    args = parser.parse_args()
+
+    if args.models_out:
+        start = time.perf_counter()
+        count = export_region_models(args.models, args.models_out)
+        print(f" Region models exported: {count} regions, {time.perf_counter() - start:.1f}s -> {args.models_out}")
+    pipeline_out = None
+    if args.pipeline and args.pipeline_out:
+        pipeline_out = export_pipeline(args.pipeline, args.pipeline_out)
+        print(f" Price pipeline exported -> {pipeline_out}")
+
+    if args.measure:
+        if not (args.pipeline and args.models_out and pipeline_out):
+            parser.error("--measure needs --pipeline, --models-out and --pipeline-out")
+        results = measure({
+            "original": (args.models, args.pipeline, False),
+            "exported": (args.models_out, pipeline_out, False),
+            "exported, mmap": (args.models_out, pipeline_out, True),
+        }, args.measure, args.horizon)
+        print(f" Memory added per worker over its imports (median of {args.measure} workers, MB); "
+              f"'used' also pages in the library code the first prediction and forecasts run")
+        print(f" {'layout':<16} {'loaded RssAnon':>15} {'loaded RssFile':>15} {'used RssAnon':>13} {'used RssFile':>13}")
+        for name, footprint in results.items():
+            print(f" {name:<16} {footprint['load RssAnon']:>15.1f} {footprint['load RssFile']:>15.1f} "
+                  f"{footprint['use RssAnon']:>13.1f} {footprint['use RssFile']:>13.1f}")
+
+if __name__ == "__main__":
+    main()
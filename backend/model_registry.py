@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Shared price-model registry for the API and the CLI.
+
+The registry resolves the newest real_estate_pipeline_v*.joblib in the
+configured model directory and keeps one loaded pipeline per process. When a
+newer file appears, or the current file is replaced, the new pipeline is
+loaded on a background thread and swapped in with a single reference
+assignment: requests already running keep the pipeline they started with,
+and no request ever waits on a reload.
+
+With compiled=True each loaded pipeline is also turned into a
+CompiledPredictor (see compiled_predictor.py), checked against the pipeline,
+and used for dict inputs; the pipeline stays the fallback. With mmap=True the
+file is opened with joblib's mmap_mode="r" (see mmap_artifacts.py).
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import joblib
+import pandas as pd
+
+from compiled_predictor import PARITY_SAMPLE, CompiledPredictor, check_parity
+from metrics import record_model_load, stage
+from prediction_cache import PredictionCache
+from region_models import artifact_version
+
+MODEL_PREFIX = "real_estate_pipeline_"
+MODEL_SUFFIX = ".joblib"
+DEFAULT_MODEL_DIR = os.environ.get(
+    "REAL_ESTATE_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Models")
+)
+
+
+def resolve_latest_pipeline(model_dir: str) -> str:
+    """Path of the newest pipeline file (version stamps sort chronologically)"""
+    model_files = [f for f in os.listdir(model_dir)
+                   if f.startswith(MODEL_PREFIX) and f.endswith(MODEL_SUFFIX)]
+    if not model_files:
+        raise FileNotFoundError(f"No {MODEL_PREFIX}*{MODEL_SUFFIX} files found in {model_dir}")
+    return os.path.join(model_dir, sorted(model_files)[-1])
+
+
+@dataclass(frozen=True)
+class LoadedPipeline:
+    pipeline: Any
+    path: str
+    version: tuple
+    loaded_at: float
+    compiled: Any = None
+
+
+class ModelRegistry:
+    """One loaded pipeline per model directory, hot-swapped when the files change"""
+
+    def __init__(self, model_dir: str, n_jobs: Optional[int] = None, check_interval: Optional[float] = 5.0,
+                 compiled: bool = False, mmap: bool = False):
+        self.model_dir = model_dir
+        self.n_jobs = n_jobs
+        self.check_interval = check_interval
+        self.compiled = compiled
+        self.mmap = mmap
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._current = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()  # held while loading
+        self._check_lock = threading.Lock()  # held only to schedule a background check
+        self._reloading = False
+
+    def current(self) -> LoadedPipeline:
+        """The pipeline to use for one request; never blocks once the first load is done"""
+        loaded = self._current
+        if loaded is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._load(resolve_latest_pipeline(self.model_dir))
+                    if self.check_interval is not None:
+                        self._next_check = time.monotonic() + self.check_interval
+            return self._current
+        if self.check_interval is not None and time.monotonic() >= self._next_check:
+            self._schedule_check()
+        return loaded
+
+    def reload(self, force: bool = False) -> bool:
+        """Synchronously load the newest pipeline if it changed; True when a swap happened"""
+        with self._lock:
+            return self._reload_if_changed(force)
+
+    def info(self) -> Dict:
+        loaded = self._current
+        return {
+            "model_dir": self.model_dir,
+            "path": loaded.path if loaded else None,
+            "loaded_at": loaded.loaded_at if loaded else None,
+            "compiled": loaded is not None and loaded.compiled is not None,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+    def _schedule_check(self):
+        with self._check_lock:
+            if self._reloading or time.monotonic() < self._next_check:
+                return
+            self._reloading = True
+            self._next_check = time.monotonic() + self.check_interval
+        threading.Thread(target=self._background_reload, name="model-registry-reload", daemon=True).start()
+
+    def _background_reload(self):
+        try:
+            with self._lock:
+                self._reload_if_changed(False)
+        finally:
+            self._reloading = False
+
+    def _reload_if_changed(self, force: bool) -> bool:
+        try:
+            path = resolve_latest_pipeline(self.model_dir)
+            current = self._current
+            if not force and current is not None and current.path == path and current.version == artifact_version(path):
+                return False
+            self._current = self._load(path)
+            self.reloads += 1
+            return True
+        except Exception as e:
+            # A half-copied or broken file keeps the previous pipeline in service
+            self.failures += 1
+            self.last_error = str(e)
+            return False
+
+    def _load(self, path: str) -> LoadedPipeline:
+        start = time.perf_counter()
+        version = artifact_version(path)
+        pipeline = joblib.load(path, mmap_mode="r" if self.mmap else None)
+        if self.n_jobs is not None:
+            for _, step in pipeline.steps:
+                if hasattr(step, "n_jobs"):
+                    step.n_jobs = self.n_jobs
+        compiled = None
+        if self.compiled:
+            try:
+                compiled = CompiledPredictor(pipeline)
+                check_parity(pipeline, compiled, PARITY_SAMPLE)
+            except Exception as e:
+                # Unsupported estimator or a parity mismatch: serve through the pipeline
+                compiled = None
+                self.last_error = f"compile failed: {e}"
+        record_model_load("price", time.perf_counter() - start)
+        return LoadedPipeline(pipeline=pipeline, path=path, version=version, loaded_at=time.time(), compiled=compiled)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(model_dir: str = None, n_jobs: Optional[int] = None,
+                 check_interval: Optional[float] = 5.0, compiled: bool = False, mmap: bool = False) -> ModelRegistry:
+    """Process-wide registry for a model directory; settings apply when it is first created"""
+    model_dir = os.path.abspath(model_dir or DEFAULT_MODEL_DIR)
+    with _registries_lock:
+        registry = _registries.get(model_dir)
+        if registry is None:
+            registry = ModelRegistry(model_dir, n_jobs=n_jobs, check_interval=check_interval, compiled=compiled,
+                                     mmap=mmap)
+            _registries[model_dir] = registry
+        return registry
+
+
+def predict_pipeline(pipeline, df: pd.DataFrame):
+    """pipeline.predict(df), with the feature transform and the estimator timed as separate stages"""
+    with stage("transform"):
+        for _, step in pipeline.steps[:-1]:
+            df = step.transform(df)
+    with stage("predict"):
+        return pipeline.steps[-1][1].predict(df)
+
+
+class RealEstatePredictor:
+    """Price predictor backed by the shared registry; cheap to construct.
+
+    With a PredictionCache, dict inputs are normalized and looked up before
+    the model runs (see prediction_cache.py).
+    """
+
+    def __init__(self, model_dir: str = None, n_jobs: Optional[int] = None,
+                 check_interval: Optional[float] = 5.0, compiled: bool = False,
+                 cache: Optional[PredictionCache] = None, mmap: bool = False):
+        self.registry = get_registry(model_dir, n_jobs=n_jobs, check_interval=check_interval, compiled=compiled,
+                                     mmap=mmap)
+        self.model_dir = self.registry.model_dir
+        self.cache = cache
+
+    @property
+    def pipeline(self):
+        return self.registry.current().pipeline
+
+    def load_model(self):
+        self.registry.current()
+
+    def predict(self, property_data: Dict) -> float:
+        loaded = self.registry.current()
+        if self.cache is None:
+            return self._predict(loaded, property_data)
+        version = (loaded.path, loaded.version)
+        property_data, key = self.cache.normalize(property_data, loaded.pipeline, version)
+        price = self.cache.get(key, version) if key is not None else None
+        if price is None:
+            price = self._predict(loaded, property_data)
+            if key is not None:
+                self.cache.put(key, price, version)
+        return price
+
+    def predict_many(self, properties: List[Dict]) -> List[float]:
+        """Score many properties with one DataFrame and one pipeline.predict call"""
+        if not properties:
+            return []
+        loaded = self.registry.current()
+        if self.cache is None:
+            return self._predict_many(loaded, properties)
+
+        version = (loaded.path, loaded.version)
+        prices = [None] * len(properties)
+        misses = {}  # key -> (normalized property, indices); repeats within the batch are scored once
+        uncached = []  # (index, normalized property)
+        for i, property_data in enumerate(properties):
+            normalized, key = self.cache.normalize(property_data, loaded.pipeline, version)
+            if key is None:
+                uncached.append((i, normalized))
+                continue
+            prices[i] = self.cache.get(key, version)
+            if prices[i] is None:
+                misses.setdefault(key, (normalized, []))[1].append(i)
+
+        to_score = [normalized for normalized, _ in misses.values()] + [normalized for _, normalized in uncached]
+        if to_score:
+            scored = self._predict_many(loaded, to_score)
+            for (key, (_, indices)), price in zip(misses.items(), scored):
+                self.cache.put(key, price, version)
+                for i in indices:
+                    prices[i] = price
+            for (i, _), price in zip(uncached, scored[len(misses):]):
+                prices[i] = price
+        return prices
+
+    def _predict(self, loaded: LoadedPipeline, property_data: Dict) -> float:
+        if loaded.compiled is not None:
+            with stage("compiled_predict"):
+                return loaded.compiled.predict(property_data)
+        df = pd.DataFrame([property_data])
+        prediction = predict_pipeline(loaded.pipeline, df)
+        return float(prediction[0])
+
+    def _predict_many(self, loaded: LoadedPipeline, properties: List[Dict]) -> List[float]:
+        if loaded.compiled is not None:
+            with stage("compiled_predict"):
+                return loaded.compiled.predict_many(properties)
+        df = pd.DataFrame(properties)
+        predictions = predict_pipeline(loaded.pipeline, df)
+        return [float(p) for p in predictions]
+
+    def predict_frame(self, df: pd.DataFrame):
+        """Score every row of a DataFrame in one pipeline.predict call"""
+        return predict_pipeline(self.pipeline, df)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Memoized price predictions keyed by normalized requests.
+
+Listings are re-priced over and over (several services price the same
+listing, the frontend form refires on every edit), so RealEstatePredictor
+consults this cache before running the pipeline. A request is normalized
+first, and the normalized request is both the cache key and what gets
+scored, so a key always maps to one price whichever variant arrived first:
+
+  * Total_Area and Price_per_SQFT are rounded to `digits` decimals
+  * Balcony is folded to True/False the way transform does (None, False,
+    "No" and anything unknown score as no balcony)
+  * Location/City are keyed by the labels the fitted encoders resolve them
+    to: "Locality, City" is split as in transform, and a locality or city the
+    model does not know becomes "Other". Every spelling or casing of an
+    unknown name therefore shares one entry. Known names stay case sensitive,
+    because the encoders are ("whitefield" scores as "Other", not as
+    "Whitefield").
+
+Entries expire after `ttl` seconds, the least recently used are evicted
+beyond `max_size`, and everything is dropped when the pipeline version
+changes.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from feature_engineering import BALCONY_VALUES, is_hashable
+
+FLOAT_FIELDS = ("Total_Area", "Price_per_SQFT")
+
+
+class PredictionCache:
+    """Bounded LRU with TTL of price predictions, tied to one pipeline version at a time"""
+
+    def __init__(self, max_size: int = 4096, ttl: float = 600.0, digits: int = 2):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.digits = digits
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (price, expires_at)
+        self._vocabulary = None  # (version, top localities, known cities)
+        self._lock = threading.Lock()
+
+    def normalize(self, property_data: Dict, pipeline, version) -> Tuple[Dict, Optional[Tuple]]:
+        """(request to score, cache key); the key is None when the request cannot be cached"""
+        normalized = dict(property_data)
+        for field in FLOAT_FIELDS:
+            value = normalized.get(field)
+            if isinstance(value, float) and math.isfinite(value):
+                normalized[field] = round(value, self.digits)
+        balcony = normalized.get("Balcony")
+        normalized["Balcony"] = bool(BALCONY_VALUES.get(balcony, 0)) if is_hashable(balcony) else False
+
+        localities, cities = self._get_vocabulary(pipeline, version)
+        location = normalized.get("Location", "Unknown")
+        if isinstance(location, str) and "," in location:
+            parts = location.split(",")
+            locality, city = parts[0].strip(), parts[-1].strip()
+        else:
+            locality, city = location, normalized.get("City", "Unknown")
+        key = (
+            locality if is_hashable(locality) and locality in localities else "Other",
+            str(city) if str(city) in cities else "Other",
+            normalized.get("BHK"),
+            normalized.get("Bathroom"),
+            normalized.get("Total_Area"),
+            normalized.get("Price_per_SQFT"),
+            normalized["Balcony"],
+        )
+        area = normalized.get("Total_Area")
+        # A missing area is filled with the batch median, so that price depends on the other rows
+        cacheable = isinstance(area, (int, float)) and math.isfinite(area) and is_hashable(key)
+        return normalized, key if cacheable else None
+
+    def get(self, key: Tuple, version=None) -> Optional[float]:
+        with self._lock:
+            if version != self.version:
+                self._reset(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            price, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return price
+
+    def put(self, key: Tuple, price: float, version=None):
+        with self._lock:
+            if version != self.version:
+                self._reset(version)
+            self._entries[key] = (price, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version=None):
+        with self._lock:
+            self._reset(version)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl
+            }
+
+    def _get_vocabulary(self, pipeline, version):
+        vocabulary = self._vocabulary
+        if vocabulary is None or vocabulary[0] != version:
+            feature_engineer = pipeline.steps[0][1]
+            city_table, _ = feature_engineer._get_encoder_tables()["City"]
+            vocabulary = self._vocabulary = (version, frozenset(feature_engineer.top_localities), frozenset(city_table))
+        return vocabulary[1], vocabulary[2]
+
+    def _reset(self, version):
+        self._entries.clear()
+        self.version = version
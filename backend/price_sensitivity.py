@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""What-if price curves and surfaces, scored in one pipeline call.
+
+A request fixes a base property and varies one or two numeric fields, each
+over explicit values or an evenly spaced start/stop/steps range:
+
+    {"base": {...PriceRequest...},
+     "vary": [{"parameter": "Total_Area", "start": 500, "stop": 2500, "steps": 200},
+              {"parameter": "BHK", "values": [1, 2, 3, 4]}]}
+
+Every grid point becomes one row of a single DataFrame, so the feature
+transform and the estimator run once for the whole grid. The response
+carries the axis values and the prices as arrays: a list for one axis, and
+for two axes one row per value of the first axis (price[i][j] is at
+vary[0] = values[i], vary[1] = values[j]). BHK and Bathroom are rounded to
+whole numbers and repeated values are dropped.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Field -> type it is scored as
+PARAMETERS = {"Total_Area": float, "Price_per_SQFT": float, "BHK": int, "Bathroom": int}
+MAX_AXES = 2
+
+
+def axis_values(parameter: str, values: Optional[Sequence[float]] = None, start: Optional[float] = None,
+                stop: Optional[float] = None, steps: int = 50) -> np.ndarray:
+    """The values one axis takes, from an explicit list or an inclusive start/stop range"""
+    if parameter not in PARAMETERS:
+        raise ValueError(f"parameter must be one of {', '.join(PARAMETERS)}")
+    if values is None:
+        if start is None or stop is None:
+            raise ValueError(f"{parameter}: give either values or start and stop")
+        if steps < 2:
+            raise ValueError(f"{parameter}: steps must be at least 2")
+        values = np.linspace(start, stop, steps)
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0 or not np.all(np.isfinite(values)):
+        raise ValueError(f"{parameter}: values must be a non-empty list of finite numbers")
+    if PARAMETERS[parameter] is int:
+        values = np.round(values).astype(np.int64)
+    # Keep the caller's order, score each value once
+    _, first = np.unique(values, return_index=True)
+    return values[np.sort(first)]
+
+
+def grid_frame(base: Dict, axes: List[tuple]) -> pd.DataFrame:
+    """One row per grid point; the first axis varies slowest"""
+    grids = np.meshgrid(*[values for _, values in axes], indexing="ij")
+    n_points = grids[0].size
+    columns = {field: [value] * n_points for field, value in base.items()}
+    for (parameter, _), grid in zip(axes, grids):
+        columns[parameter] = grid.ravel()
+    return pd.DataFrame(columns)
+
+
+def price_sensitivity(predictor, base: Dict, axes: List[Dict], max_points: int) -> Dict:
+    """Score the grid spanned by `axes` (dicts of axis_values arguments) around `base`"""
+    if not 1 <= len(axes) <= MAX_AXES:
+        raise ValueError(f"vary takes 1 to {MAX_AXES} parameters")
+    parameters = [axis["parameter"] for axis in axes]
+    if len(set(parameters)) != len(parameters):
+        raise ValueError("each parameter can be varied once")
+    # Checked before any axis is built: steps alone can ask for an arbitrarily large array
+    requested = 1
+    for axis in axes:
+        requested *= len(axis["values"]) if axis.get("values") is not None else max(int(axis.get("steps", 50)), 1)
+    if requested > max_points:
+        raise ValueError(f"grid has {requested} points; the limit is {max_points}")
+    resolved = [(axis["parameter"], axis_values(**axis)) for axis in axes]
+    shape = tuple(len(values) for _, values in resolved)
+    n_points = int(np.prod(shape))
+    if n_points > max_points:
+        raise ValueError(f"grid has {n_points} points; the limit is {max_points}")
+
+    prices = np.asarray(predictor.predict_frame(grid_frame(base, resolved)), dtype=np.float64).reshape(shape)
+    return {
+        "base": base,
+        "parameters": parameters,
+        "values": {parameter: values.tolist() for parameter, values in resolved},
+        "predicted_price": prices.tolist(),
+        "points": n_points
+    }
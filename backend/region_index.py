@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Regional growth index: every region's forecast at standard horizons, presorted.
+
+Built once from the region models (or a forecast store) whenever they are
+loaded, and queried by /region_rankings without running Prophet. For each
+region and horizon h (months after the region's last training date):
+
+    latest_price        last historical price
+    forecast_price      yhat h months out
+    growth_pct          forecast_price / latest_price - 1, in percent
+    lower, upper        interval bounds h months out
+    interval_width_pct  (upper - lower) / forecast_price, in percent
+
+Values are float64 arrays with one slot per region, and for every horizon
+and sort key the region order is sorted ahead of time. A query is a boolean
+filter mask over a few dozen floats, applied to the presorted order and cut
+to top_k.
+
+    cd backend
+    python region_index.py --models ../Models/all_region_models.joblib --horizon 12 --top-k 10
+"""
+import argparse
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from forecast_cache import ForecastEntry
+from forecasting import compute_forecast
+
+STANDARD_HORIZONS = (6, 12, 24, 36)
+SORT_KEYS = ("growth_pct", "forecast_price", "latest_price", "interval_width_pct")
+# Columns per horizon; latest_price is shared by all horizons
+HORIZON_COLUMNS = ("forecast_price", "growth_pct", "lower", "upper", "interval_width_pct")
+
+
+class RegionIndex:
+    """Immutable growth index; build with from_entries() or from_models()"""
+
+    def __init__(self, regions: List[str], last_training_dates: List[str], latest_price: np.ndarray,
+                 columns: Dict[int, Dict[str, np.ndarray]], version=None, uncertainty: str = "full",
+                 build_seconds: float = 0.0):
+        self.regions = regions
+        self.last_training_dates = last_training_dates
+        self.latest_price = latest_price
+        self.columns = columns
+        self.horizons = tuple(sorted(columns))
+        self.version = version
+        self.uncertainty = uncertainty
+        self.built_at = time.time()
+        self.build_seconds = build_seconds
+        self._positions = {region: i for i, region in enumerate(regions)}
+        # (horizon, key) -> region positions, ascending; NaN sorts last
+        self._orders = {}
+        for horizon, values in columns.items():
+            for key in SORT_KEYS:
+                column = latest_price if key == "latest_price" else values[key]
+                self._orders[(horizon, key)] = np.argsort(column, kind="stable")
+
+    @classmethod
+    def from_entries(cls, entries: Dict[str, ForecastEntry], horizons: Iterable[int] = STANDARD_HORIZONS,
+                     version=None, uncertainty: str = "full", build_seconds: float = 0.0) -> "RegionIndex":
+        """Index forecasts that cover at least max(horizons) months"""
+        regions = list(entries)
+        horizons = sorted(set(horizons))
+        n = len(regions)
+        latest_price = np.full(n, np.nan)
+        columns = {h: {name: np.full(n, np.nan) for name in HORIZON_COLUMNS} for h in horizons}
+        for i, region in enumerate(regions):
+            entry = entries[region]
+            prices = np.asarray(entry.history_price, dtype=np.float64)
+            prices = prices[~np.isnan(prices)]
+            if len(prices):
+                latest_price[i] = prices[-1]
+            for h in horizons:
+                if h > len(entry.yhat):
+                    continue
+                values = columns[h]
+                values["forecast_price"][i] = entry.yhat[h - 1]
+                values["lower"][i] = entry.yhat_lower[h - 1]
+                values["upper"][i] = entry.yhat_upper[h - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for values in columns.values():
+                values["growth_pct"] = (values["forecast_price"] / latest_price - 1) * 100
+                values["interval_width_pct"] = (values["upper"] - values["lower"]) / values["forecast_price"] * 100
+        last_training_dates = [entries[region].last_training_date for region in regions]
+        return cls(regions, last_training_dates, latest_price, columns, version, uncertainty, build_seconds)
+
+    @classmethod
+    def from_models(cls, models, horizons: Iterable[int] = STANDARD_HORIZONS, uncertainty: str = "analytic",
+                    version=None) -> "RegionIndex":
+        """Forecast every region once at the longest horizon and index the results"""
+        start = time.perf_counter()
+        horizons = sorted(set(horizons))
+        entries = {region: compute_forecast(models[region], horizons[-1], uncertainty) for region in models}
+        return cls.from_entries(entries, horizons, version, uncertainty, time.perf_counter() - start)
+
+    def rankings(self, horizon: int, sort: str = "growth_pct", descending: bool = True, top_k: Optional[int] = 10,
+                 regions: Optional[Iterable[str]] = None, min_growth_pct: Optional[float] = None,
+                 max_growth_pct: Optional[float] = None, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None, max_interval_width_pct: Optional[float] = None) -> Dict:
+        """Regions at `horizon` matching every given filter, ordered by `sort`, at most top_k of them"""
+        if horizon not in self.columns:
+            raise ValueError(f"horizon must be one of {', '.join(map(str, self.horizons))}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        values = self.columns[horizon]
+        order = self._orders[(horizon, sort)]
+        if descending:
+            # Reverse the ascending order but keep regions without a value (NaN) last
+            column = self.latest_price if sort == "latest_price" else values[sort]
+            valid = np.count_nonzero(~np.isnan(column))
+            order = np.concatenate([order[:valid][::-1], order[valid:]])
+
+        mask = np.ones(len(self.regions), dtype=bool)
+        bounds = ((values["growth_pct"], min_growth_pct, max_growth_pct),
+                  (self.latest_price, min_price, max_price),
+                  (values["interval_width_pct"], None, max_interval_width_pct))
+        for column, low, high in bounds:
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+        if regions is not None:
+            selected = np.zeros(len(self.regions), dtype=bool)
+            selected[[self._positions[r] for r in regions if r in self._positions]] = True
+            mask &= selected
+
+        matched = order[mask[order]]
+        rows = matched if top_k is None else matched[:top_k]
+        return {
+            "horizon": horizon,
+            "sort": sort,
+            "order": "desc" if descending else "asc",
+            "matched": int(len(matched)),
+            "regions": [self._row(i, values) for i in rows.tolist()]
+        }
+
+    def info(self) -> Dict:
+        return {
+            "regions": len(self.regions),
+            "horizons": list(self.horizons),
+            "uncertainty": self.uncertainty,
+            "built_at": self.built_at,
+            "build_seconds": round(self.build_seconds, 3)
+        }
+
+    def _row(self, i: int, values: Dict[str, np.ndarray]) -> Dict:
+        row = {"region": self.regions[i], "last_training_date": self.last_training_dates[i],
+               "latest_price": _number(self.latest_price[i])}
+        for name in HORIZON_COLUMNS:
+            row[name] = _number(values[name][i])
+        return row
+
+
+def _number(value) -> Optional[float]:
+    # NaN (no interval, or a horizon past a stored forecast) is null in JSON
+    value = float(value)
+    return None if value != value else value
+
+
+def main():
+    from region_models import load_region_models
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", default="../Models/all_region_models.joblib", help="Region models artifact")
+    parser.add_argument("--horizon", type=int, default=12, help="Horizon to rank by (default: 12)")
+    parser.add_argument("--sort", default="growth_pct", choices=SORT_KEYS, help="Sort key (default: growth_pct)")
+    parser.add_argument("--top-k", type=int, default=10, help="Regions to show (default: 10)")
+    parser.add_argument("--uncertainty", default="analytic", help="Interval mode for the build (default: analytic)")
+    args = parser.parse_args()
+
+    models = load_region_models(args.models)
+    index = RegionIndex.from_models(models, sorted(set(STANDARD_HORIZONS) | {args.horizon}), args.uncertainty)
+    repeat = 10000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = index.rankings(args.horizon, args.sort, top_k=args.top_k)
+    query_us = (time.perf_counter() - start) / repeat * 1e6
+
+    print(f" Indexed {len(index.regions)} regions in {index.build_seconds:.2f}s ({args.uncertainty}); "
+          f"one top-{args.top_k} query takes {query_us:.0f} us")
+    print(f" {'region':<24} {'latest':>12} {'forecast':>12} {'growth %':>9} {'width %':>8}")
+    for row in result["regions"]:
+        print(f" {row['region']:<24} {row['latest_price']:>12,.0f} {row['forecast_price']:>12,.0f} "
+              f"{row['growth_pct']:>9.2f} {row['interval_width_pct'] if row['interval_width_pct'] is not None else float('nan'):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Per-region Prophet artifacts with lazy, bounded loading.
+
+Layout of a region model directory:
+
+    manifest.json          region -> file, plus last training date and size
+    <region>.joblib        one fitted Prophet model per region
+
+Convert the existing dict-of-models artifact once:
+
+    cd backend
+    python region_models.py --models ../Models/all_region_models.joblib \
+        --out ../Models/region_models
+
+LazyRegionModels reads only the manifest at startup and deserializes a region
+on first use, keeping at most `max_loaded` models in memory (LRU). With
+mmap=True either layout is opened with joblib's mmap_mode="r" (see
+mmap_artifacts.py).
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Union
+
+import joblib
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def region_filename(region: str, taken: set, tag: str = None) -> str:
+    """Filesystem-safe, unique file name for a region; `tag` (e.g. a build time) goes before the extension"""
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", str(region)).strip("_") or "region"
+    extension = f".{tag}.joblib" if tag else ".joblib"
+    name = f"{stem}{extension}"
+    suffix = 1
+    while name in taken:
+        suffix += 1
+        name = f"{stem}_{suffix}{extension}"
+    taken.add(name)
+    return name
+
+
+def convert_region_models(models_path: str, out_dir: str) -> Dict:
+    """Split a dict-of-models joblib file into one file per region plus a manifest"""
+    models = joblib.load(models_path)
+    os.makedirs(out_dir, exist_ok=True)
+    taken = set()
+    regions = {}
+    for region, model in models.items():
+        if isinstance(model, dict):  # Handle dict inside dict case
+            model = list(model.values())[0]
+        regions[region] = write_region_model(out_dir, region_filename(region, taken), model)
+    return write_manifest(out_dir, regions, models_path)
+
+
+def write_region_model(out_dir: str, filename: str, model) -> Dict:
+    """Atomically write one region's model; returns its manifest entry"""
+    path = os.path.join(out_dir, filename)
+    tmp_path = path + ".tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+    return {
+        "file": filename,
+        "bytes": os.path.getsize(path),
+        "last_training_date": model.history["ds"].max().isoformat()
+    }
+
+
+def write_manifest(out_dir: str, regions: Dict, source: str) -> Dict:
+    """Atomically replace the manifest; readers switch to the new region set in one step"""
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": os.path.abspath(source),
+        "regions": regions
+    }
+    tmp_path = os.path.join(out_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_FILE))
+    return manifest
+
+
+class LazyRegionModels(Mapping):
+    """Read-only region -> Prophet mapping backed by a region model directory.
+
+    Membership, iteration and len() answer from the manifest alone; indexing
+    loads the region's file on first use and evicts the least recently used
+    model once more than `max_loaded` are resident.
+    """
+
+    def __init__(self, path: str, max_loaded: int = 16, mmap: bool = False):
+        self.path = path
+        self.max_loaded = max_loaded
+        self.mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported region model manifest: {manifest.get('format_version')}")
+        self.manifest = manifest
+        self.regions = manifest["regions"]
+        self.loads = 0
+        self.evictions = 0
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        self._region_locks = {region: threading.Lock() for region in self.regions}
+
+    def __getitem__(self, region):
+        with self._lock:
+            model = self._loaded.get(region)
+            if model is not None:
+                self._loaded.move_to_end(region)
+                return model
+        if region not in self.regions:
+            raise KeyError(region)
+
+        # Per-region lock so concurrent first requests deserialize the file once
+        with self._region_locks[region]:
+            with self._lock:
+                model = self._loaded.get(region)
+                if model is not None:
+                    self._loaded.move_to_end(region)
+                    return model
+            model = joblib.load(os.path.join(self.path, self.regions[region]["file"]), mmap_mode=self.mmap_mode)
+            with self._lock:
+                self.loads += 1
+                self._loaded[region] = model
+                while len(self._loaded) > self.max_loaded:
+                    self._loaded.popitem(last=False)
+                    self.evictions += 1
+            return model
+
+    def __contains__(self, region):
+        return region in self.regions
+
+    def __iter__(self):
+        return iter(self.regions)
+
+    def __len__(self):
+        return len(self.regions)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "regions": len(self.regions),
+                "loaded": list(self._loaded.keys()),
+                "max_loaded": self.max_loaded,
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
+
+
+def artifact_version(path: str):
+    """Cheap identity of a model artifact: changes whenever the file (or manifest) is replaced"""
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST_FILE)
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_region_models(path: str, max_loaded: int = 16, mmap: bool = False) -> Union[Dict, LazyRegionModels]:
+    """Open either layout: a per-region directory lazily, or a dict-of-models file eagerly"""
+    if os.path.isdir(path):
+        return LazyRegionModels(path, max_loaded=max_loaded, mmap=mmap)
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a dict-of-models joblib file into per-region artifacts")
+    parser.add_argument("--models", required=True, help="Path to all_region_models.joblib")
+    parser.add_argument("--out", required=True, help="Output region model directory")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = convert_region_models(args.models, args.out)
+    print(f" Region models written: {len(manifest['regions'])} regions, "
+          f"{time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Incremental, parallel retraining of the per-region Prophet models.
+
+Replaces the serial loop in Notebooks/Time_Series_Fore_Casting.ipynb:
+
+    cd backend
+    python retrain_regions.py --data ../State_time_series.csv --models ../Models/all_region_models.joblib
+
+1. Read the regional series (Date, RegionName and a value column,
+   ZHVI_AllHomes by default) and clean every region as the notebook does:
+   missing values are forward-filled in file order, then values more than
+   10% away from the centred 3-month rolling median are replaced by it.
+2. Hash each region's cleaned series together with the training settings
+   and compare with the hashes saved by the previous run (next to the
+   artifact: <models>.retrain.json, or retrain.json inside a region
+   directory).
+3. Fit Prophet only for new or changed regions, on a process pool with one
+   worker per core by default.
+4. Write the artifact atomically (temporary file + os.replace), then the
+   hashes. A running API picks the new file up on its next request and never
+   reads a half-written one; if the run dies before the hashes are saved,
+   the next run simply refits the same regions again.
+
+--models can be the dict-of-models file or a per-region directory made by
+region_models.py; in the directory layout only the changed regions get new
+files, written under new (timestamped) names and switched in by the
+manifest swap. Files only the previous manifest references are kept until
+the next run. Rebuild a forecast store (forecast_store.py) afterwards if the
+API runs with FORECAST_MODE=store.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from region_models import MANIFEST_FILE, region_filename, write_manifest, write_region_model
+
+STATE_SUFFIX = ".retrain.json"
+STATE_FILE = "retrain.json"
+# Same model as the notebook (Prophet defaults) and the same cleaning; part of every region's hash
+PROPHET_PARAMS = {}
+FILL_METHOD = "ffill"
+ROLLING_WINDOW = 3
+OUTLIER_THRESHOLD = 0.10
+MIN_ROWS = 2
+
+
+def training_settings() -> Dict:
+    return {"prophet": PROPHET_PARAMS, "fill": FILL_METHOD, "rolling_window": ROLLING_WINDOW,
+            "outlier_threshold": OUTLIER_THRESHOLD}
+
+
+def load_series(path: str, value_column: str = "ZHVI_AllHomes") -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Cleaned (ds, y) arrays per region, in the notebook's order"""
+    df = pd.read_csv(path, usecols=["Date", "RegionName", value_column], parse_dates=["Date"])
+    df = df.rename(columns={value_column: "value"})
+    # The notebook forward-fills the whole column in file order (date by date) before sorting by region
+    df["value"] = df["value"].ffill()
+    df = df.sort_values(["RegionName", "Date"], kind="mergesort")
+    df = df.reset_index(drop=True)
+    rolling = (df.groupby("RegionName", sort=False)["value"]
+               .rolling(window=ROLLING_WINDOW, center=True).median()
+               .reset_index(level=0, drop=True))
+    is_outlier = (df["value"] - rolling).abs() > OUTLIER_THRESHOLD * rolling.abs()
+    df["value"] = df["value"].where(~is_outlier, rolling)
+
+    series = {}
+    for region, group in df.groupby("RegionName", sort=False):
+        series[region] = (group["Date"].to_numpy(dtype="datetime64[ns]"), group["value"].to_numpy(dtype=np.float64))
+    return series
+
+
+def content_hash(ds: np.ndarray, y: np.ndarray, settings: Dict) -> str:
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    digest.update(ds.astype("datetime64[ns]").view(np.int64).tobytes())
+    digest.update(y.astype(np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def fit_region(region: str, ds: np.ndarray, y: np.ndarray):
+    """Pool task: fit one region's model; returns (region, model, seconds)"""
+    from prophet import Prophet
+
+    logger = logging.getLogger("cmdstanpy")
+    if not logger.handlers:
+        # cmdstanpy installs an INFO handler only when none exists; keep warnings and errors
+        handler = logging.StreamHandler()
+        handler.setLevel(logging.WARNING)
+        logger.addHandler(handler)
+    start = time.perf_counter()
+    model = Prophet(**PROPHET_PARAMS)
+    model.fit(pd.DataFrame({"ds": ds, "y": y}))
+    return region, model, time.perf_counter() - start
+
+
+def state_path(models_path: str) -> str:
+    if os.path.isdir(models_path):
+        return os.path.join(models_path, STATE_FILE)
+    return models_path + STATE_SUFFIX
+
+
+def read_state(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("regions", {})
+
+
+def write_state(path: str, regions: Dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "regions": regions}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_models(models_path: str):
+    """Existing region -> model mapping ({} on the first run)"""
+    if os.path.isdir(models_path):
+        from region_models import LazyRegionModels
+        return LazyRegionModels(models_path) if os.path.exists(os.path.join(models_path, MANIFEST_FILE)) else {}
+    return joblib.load(models_path) if os.path.exists(models_path) else {}
+
+
+def write_models(models_path: str, existing, fitted: Dict, keep: list, source: str):
+    """Write `keep` regions (refitted ones from `fitted`, the rest from `existing`) atomically"""
+    if os.path.isdir(models_path):
+        # Refitted regions get new file names, so a reader of the current manifest never loads a new
+        # model under the old version; the manifest swap switches every region at once
+        manifest_regions = getattr(existing, "regions", {})
+        taken = set(os.listdir(models_path))
+        tag = time.strftime("%Y%m%dT%H%M%S")
+        regions = {}
+        for region in keep:
+            if region in fitted:
+                regions[region] = write_region_model(models_path, region_filename(region, taken, tag), fitted[region])
+            else:
+                regions[region] = manifest_regions[region]
+        write_manifest(models_path, regions, source)
+        # Files of the manifest just replaced stay for readers that still hold it; older ones go
+        referenced = {entry["file"] for entry in regions.values()} | {entry["file"] for entry in manifest_regions.values()}
+        for name in taken:
+            if name.endswith(".joblib") and name not in referenced:
+                os.remove(os.path.join(models_path, name))
+        return
+
+    models = {region: fitted[region] if region in fitted else existing[region] for region in keep}
+    directory = os.path.dirname(os.path.abspath(models_path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(models_path)}.tmp")
+    joblib.dump(models, tmp_path)
+    os.replace(tmp_path, models_path)
+
+
+def retrain(data_path: str, models_path: str, value_column: str = "ZHVI_AllHomes", workers: int = None,
+            force: bool = False, prune: bool = False, dry_run: bool = False) -> Dict:
+    start = time.perf_counter()
+    series = load_series(data_path, value_column)
+    settings = training_settings()
+    previous = read_state(state_path(models_path))
+    existing = read_models(models_path)
+
+    hashes, changed, skipped = {}, [], []
+    for region, (ds, y) in series.items():
+        if np.count_nonzero(~np.isnan(y)) < MIN_ROWS:
+            skipped.append(region)
+            continue
+        hashes[region] = content_hash(ds, y, settings)
+        if force or region not in existing or previous.get(region, {}).get("hash") != hashes[region]:
+            changed.append(region)
+    # Regions missing from the new data keep their model unless pruned
+    dropped = [region for region in existing if region not in hashes]
+    keep = list(hashes) + ([] if prune else dropped)
+    summary = {"regions": len(keep), "changed": changed, "skipped": skipped,
+               "pruned": dropped if prune else [], "fit_seconds": 0.0}
+    if dry_run or (not changed and not (prune and dropped)):
+        summary["seconds"] = round(time.perf_counter() - start, 2)
+        return summary
+
+    fitted = {}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(changed))) if changed else 1
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(fit_region, region, *series[region]) for region in changed]
+            for future in as_completed(futures):
+                region, model, seconds = future.result()
+                fitted[region] = model
+                summary["fit_seconds"] += seconds
+                print(f" Fitted {region} ({seconds:.1f}s)")
+
+    write_models(models_path, existing, fitted, keep, data_path)
+    state = {region: entry for region, entry in previous.items() if region in keep}
+    for region in changed:
+        ds = series[region][0]
+        state[region] = {"hash": hashes[region], "rows": len(ds), "last_date": str(ds.max())[:10],
+                         "fitted_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    write_state(state_path(models_path), state)
+    summary["fit_seconds"] = round(summary["fit_seconds"], 2)
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Regional time series CSV (e.g. State_time_series.csv)")
+    parser.add_argument("--models", default=os.path.join("..", "Models", "all_region_models.joblib"),
+                        help="Region models artifact to update: dict-of-models file or region directory")
+    parser.add_argument("--value-column", default="ZHVI_AllHomes", help="Column with the price series")
+    parser.add_argument("--workers", type=int, default=None, help="Fitting processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Refit every region")
+    parser.add_argument("--prune", action="store_true", help="Drop regions that are no longer in the data")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which regions would be refitted")
+    args = parser.parse_args()
+
+    summary = retrain(args.data, args.models, args.value_column, args.workers, args.force, args.prune, args.dry_run)
+    action = "would refit" if args.dry_run else "refitted"
+    print(f" {len(summary['changed'])} of {summary['regions']} regions {action}"
+          f"{': ' + ', '.join(summary['changed']) if summary['changed'] and len(summary['changed']) <= 10 else ''}")
+    if summary["skipped"]:
+        print(f" Skipped (fewer than {MIN_ROWS} values): {', '.join(summary['skipped'])}")
+    if summary["pruned"]:
+        print(f" Pruned: {', '.join(summary['pruned'])}")
+    print(f" Done in {summary['seconds']}s (fitting {summary['fit_seconds']}s across processes) -> {args.models}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Coalescing of identical concurrent work on the event loop.
+
+When many clients ask for the same forecast at once (a dashboard loading),
+only the first request starts the computation; every other request with the
+same key awaits that one and gets the same result or the same exception.
+The computation runs as its own task, so a client that disconnects does not
+cancel it for the others, and the key is released as soon as it finishes -
+results are not kept (that is the forecast cache's job).
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """At most one in-flight computation per key; concurrent callers share it"""
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable]):
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        # shield: cancelling one waiter must not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Marks the exception retrieved even if every waiter went away before it was raised
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._in_flight), "leaders": self.leaders, "coalesced": self.coalesced}
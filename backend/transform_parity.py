@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Parity check and throughput comparison for RealEstateFeatureEngineer.transform.
+
+Runs the vectorized transform and the baseline row-by-row implementation
+(kept below as legacy_transform) on the same synthetic listings, asserts that
+both produce identical frames, and prints rows per second for each. The one
+expected difference is City for rows without a comma in Location that share
+a batch with rows that have one (see mixed_batch_rows).
+
+The training side is checked the same way: the shared cleaning stage behind
+fit/get_target against the original per-row cleaning (legacy_clean_training).
+
+Bulk scoring (prediction_vs.py score) is checked on a file whose chunks infer
+different dtypes on their own: chunked CSV and Parquet output must match
+scoring the whole file at once.
+
+    cd backend
+    python transform_parity.py --rows 1 100 10000 --training-rows 200000
+"""
+import argparse
+import copy
+import glob
+import os
+import re
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models", "real_estate_pipeline_v*.joblib")
+
+
+def legacy_transform(fe, X):
+    """Row-by-row transform as in the baseline tree, before any of these changes (reference only)"""
+    df = X.copy()
+
+    if 'BHK' not in df.columns:
+        if 'Property Title' in df.columns:
+            df['BHK'] = df['Property Title'].apply(fe._extract_bhk_training)
+        else:
+            df['BHK'] = 2
+
+    if 'Locality' not in df.columns:
+        if 'Location' in df.columns and any(',' in str(loc) for loc in df['Location'].dropna()):
+            df['Location_split'] = df['Location'].str.split(',')
+            df['Locality'] = df['Location_split'].apply(lambda x: x[0].strip() if x and len(x) > 0 else 'Unknown')
+            df['City'] = df['Location_split'].apply(lambda x: x[-1].strip() if x and len(x) > 0 else 'Unknown')
+        else:
+            df['Locality'] = df.get('Location', 'Unknown')
+            df['City'] = df.get('City', 'Unknown')
+
+    if 'Baths' not in df.columns:
+        df['Baths'] = df.get('Bathroom', 1)
+
+    if 'Has_Balcony' not in df.columns:
+        if 'Balcony' in df.columns:
+            df['Has_Balcony'] = df['Balcony'].map({'Yes': 1, 'Y': 1, 'No': 0, 'N': 0, True: 1, False: 0}).fillna(0)
+        else:
+            df['Has_Balcony'] = 0
+
+    df['Total_Area'] = pd.to_numeric(df['Total_Area'], errors='coerce')
+    df['Price_per_SQFT'] = pd.to_numeric(df['Price_per_SQFT'], errors='coerce')
+    df['BHK'] = pd.to_numeric(df['BHK'], errors='coerce').fillna(2)
+    df['Baths'] = pd.to_numeric(df['Baths'], errors='coerce').fillna(1)
+
+    df['Total_Area'] = df['Total_Area'].fillna(df['Total_Area'].median())
+    df['Price_per_SQFT'] = df['Price_per_SQFT'].fillna(fe.price_per_sqft_median)
+    df['Has_Balcony'] = df['Has_Balcony'].fillna(0)
+
+    df.loc[~df['Locality'].isin(fe.top_localities), 'Locality'] = 'Other'
+
+    df['Property_Size_Category'] = df['Total_Area'].apply(fe.categorize_property_size)
+    df['BHK_Category'] = df['BHK'].apply(fe.categorize_bhk)
+
+    df['log_area'] = np.log1p(df['Total_Area'])
+    df['log_price_per_sqft'] = np.log1p(df['Price_per_SQFT'].fillna(fe.price_per_sqft_median))
+    df['Area_per_Room'] = df['Total_Area'] / np.maximum(df['BHK'], 1)
+    df['log_area_per_room'] = np.log1p(df['Area_per_Room'])
+    df['Bath_to_BHK_ratio'] = df['Baths'] / np.maximum(df['BHK'], 1)
+    df['Total_Rooms'] = df['BHK'] + df['Baths']
+    df['Area_Efficiency'] = df['Total_Area'] / np.maximum(df['Total_Rooms'], 1)
+    df['Area_x_BHK'] = df['Total_Area'] * df['BHK']
+    df['Area_x_Baths'] = df['Total_Area'] * df['Baths']
+    df['log_Area_x_BHK'] = np.log1p(df['Area_x_BHK'])
+    df['Price_per_Room'] = df['Price_per_SQFT'] * df['Area_per_Room']
+    df['Is_Premium_Size'] = (df['Total_Area'] > fe.area_quantile_75).astype(int)
+    df['Has_Multiple_Baths'] = (df['Baths'] >= 2).astype(int)
+
+    df['Luxury_Score'] = df.apply(fe.calculate_luxury_score, axis=1)
+
+    categorical_features = ['City', 'Locality', 'Property_Size_Category', 'BHK_Category']
+    for feature in categorical_features:
+        if feature in df.columns and feature in fe.label_encoders:
+            le = fe.label_encoders[feature]
+            df[feature] = df[feature].astype(str).apply(
+                lambda x: x if x in le.classes_ else 'Other'
+            )
+            if 'Other' not in le.classes_:
+                le.classes_ = np.append(le.classes_, 'Other')
+            df[feature] = le.transform(df[feature])
+
+    feature_cols = ['log_area', 'Baths', 'Has_Balcony', 'BHK',
+                    'log_area_per_room', 'Bath_to_BHK_ratio', 'Total_Rooms', 'Area_Efficiency',
+                    'Area_x_Baths', 'log_Area_x_BHK', 'Is_Premium_Size', 'Has_Multiple_Baths', 'Price_per_Room',
+                    'Luxury_Score', 'City', 'Locality', 'Property_Size_Category', 'BHK_Category']
+    for col in feature_cols:
+        if col not in df.columns:
+            df[col] = 0
+    return df[feature_cols]
+
+
+def legacy_clean_training(X):
+    """Row-by-row cleaning that fit and get_target each ran before (reference only)"""
+    def parse_price(price_str):
+        if pd.isna(price_str):
+            return np.nan
+        price_str = str(price_str).strip().replace('₹', '').replace(',', '')
+        numeric = re.findall(r'[\d.]+', price_str)
+        if 'Cr' in price_str or 'cr' in price_str:
+            return float(numeric[0]) * 100 if numeric else np.nan
+        if 'L' in price_str or 'l' in price_str:
+            return float(numeric[0]) if numeric else np.nan
+        if numeric:
+            val = float(numeric[0])
+            return val / 100000 if val > 10000 else val
+        return np.nan
+
+    def extract_bhk(title):
+        if pd.isna(title):
+            return 0
+        bhk_match = re.search(r'(\d+)\s*BHK', str(title), re.IGNORECASE)
+        return int(bhk_match.group(1)) if bhk_match else 0
+
+    df = X.copy()
+    df = df.drop_duplicates()
+    df['Price_in_Lakhs'] = df['Price'].apply(parse_price)
+    df['Location_split'] = df['Location'].str.split(',')
+    df['Locality'] = df['Location_split'].apply(lambda x: x[0].strip() if x and len(x) > 0 else 'Unknown')
+    df['City'] = df['Location_split'].apply(lambda x: x[-1].strip() if x and len(x) > 0 else 'Unknown')
+    df['BHK'] = df['Property Title'].apply(extract_bhk)
+    df['Has_Balcony'] = df['Balcony'].map({'Yes': 1, 'Y': 1, 'No': 0, 'N': 0}).fillna(0)
+    df['Total_Area'] = pd.to_numeric(df['Total_Area'], errors='coerce')
+    df['Price_per_SQFT'] = pd.to_numeric(df['Price_per_SQFT'], errors='coerce')
+    df['Baths'] = pd.to_numeric(df['Baths'], errors='coerce').fillna(1)
+    df['Total_Area'] = df['Total_Area'].fillna(df.groupby('BHK')['Total_Area'].transform('median'))
+    top_localities = df['Locality'].value_counts().nlargest(30).index.tolist()
+    df.loc[~df['Locality'].isin(top_localities), 'Locality'] = 'Other'
+
+    def remove_outliers_iqr(series, factor=1.5):
+        Q1 = series.quantile(0.25)
+        Q3 = series.quantile(0.75)
+        IQR = Q3 - Q1
+        return (series >= Q1 - factor * IQR) & (series <= Q3 + factor * IQR)
+
+    price_mask = remove_outliers_iqr(df['Price_in_Lakhs'].dropna())
+    area_mask = remove_outliers_iqr(df['Total_Area'].dropna())
+    pps_mask = remove_outliers_iqr(df['Price_per_SQFT'].dropna())
+    valid_price_idx = df['Price_in_Lakhs'].dropna().index
+    df = df.drop(valid_price_idx[~(price_mask & area_mask & pps_mask)])
+    df['Property_Size_Category'] = df['Total_Area'].apply(lambda a: 'Compact' if a < 500 else 'Medium' if a < 1000 else 'Large' if a < 2000 else 'Luxury')
+    df['BHK_Category'] = df['BHK'].apply(lambda b: '1BHK' if b <= 1 else '2BHK' if b <= 2 else '3BHK' if b <= 3 else '4+BHK')
+    return df, df['Price_in_Lakhs'].dropna(), top_localities
+
+
+def make_api_rows(fe, n, seed=0):
+    """Synthetic rows shaped like PriceRequest, covering bin edges and unseen values"""
+    rng = np.random.default_rng(seed)
+    localities = list(fe.top_localities) + ['Koramangala', 'Andheri West']
+    cities = list(fe.label_encoders['City'].classes_) + ['Jaipur']
+    locality = rng.choice(localities, n)
+    city = rng.choice(cities, n)
+    with_city = rng.random(n) < 0.7
+    location = np.where(with_city, np.char.add(np.char.add(locality.astype(str), ', '), city.astype(str)), locality)
+    area = rng.choice([499, 500, 999, 1000, 1500, 1501, 1999, 2000, 2001], n).astype(float)
+    area = np.where(rng.random(n) < 0.5, rng.uniform(200, 5000, n), area)
+    return pd.DataFrame({
+        'Location': location,
+        'City': city,
+        'BHK': rng.integers(0, 7, n),
+        'Total_Area': area,
+        'Price_per_SQFT': rng.uniform(1500, 20000, n),
+        'Bathroom': rng.integers(1, 6, n),
+        'Balcony': rng.choice(np.array([True, False, None], dtype=object), n),
+    })
+
+
+def make_training_rows(n, seed=1, with_price=False):
+    """Synthetic rows shaped like the raw scrape (Property Title, Baths, Yes/No balcony, ₹ prices)"""
+    rng = np.random.default_rng(seed)
+    bhk = rng.integers(1, 6, n)
+    titles = np.char.add(bhk.astype(str), np.array([' BHK Flat for sale', 'BHK Villa', ' Bedroom House'])[rng.integers(0, 3, n)])
+    area = rng.uniform(200, 5000, n).astype(object)
+    area[rng.random(n) < 0.05] = None
+    localities = np.char.add('Sector ', rng.integers(1, 60, n).astype(str))
+    location = np.where(rng.random(n) < 0.8, np.char.add(localities, ', Pune'),
+                        np.char.add(localities, ', Baner, Pune'))
+    df = pd.DataFrame({
+        'Property Title': titles,
+        'Location': location if with_price else np.char.add(np.array(['Wagholi', 'Narhe', 'Baner', 'Avadi'])[rng.integers(0, 4, n)], ', Pune'),
+        'Total_Area': area,
+        'Price_per_SQFT': rng.uniform(1500, 20000, n),
+        'Baths': rng.integers(1, 6, n),
+        'Balcony': rng.choice(['Yes', 'No', 'Y', 'N', None], n),
+    })
+    if with_price:
+        lakhs = rng.lognormal(4, 0.8, n)
+        price = np.where(lakhs >= 100, np.char.add(np.char.add('₹', np.round(lakhs / 100, 2).astype(str)), ' Cr'),
+                         np.char.add(np.char.add('₹', np.round(lakhs, 1).astype(str)), ' L')).astype(object)
+        raw = rng.random(n) < 0.05
+        price[raw] = np.char.mod('%d', (lakhs[raw] * 100000).astype(np.int64))
+        df.insert(1, 'Price', price)
+    return df
+
+
+def mixed_batch_rows(X):
+    """Rows without a comma in Location in a batch where other rows have one.
+
+    The baseline split every row of such a batch, so these rows got their
+    whole Location as the city. The per-row split added with
+    /predict_price_batch keeps their City instead: the one expected
+    difference from the baseline.
+    """
+    if 'Locality' in X.columns or 'Location' not in X.columns:
+        return pd.Series(False, index=X.index)
+    has_comma = X['Location'].apply(lambda x: isinstance(x, str) and ',' in x)
+    return ~has_comma if has_comma.any() else pd.Series(False, index=X.index)
+
+
+def check_parity(fe, X):
+    """Assert the transform matches the baseline; returns the number of expected mixed-batch differences"""
+    expected = legacy_transform(copy.deepcopy(fe), X)
+    actual = fe.transform(X)
+    mixed = mixed_batch_rows(X)
+    pd.testing.assert_frame_equal(actual[~mixed], expected[~mixed])
+    if mixed.any():
+        # Only City differs, and it is what the baseline gave the same rows in a batch of their own
+        pd.testing.assert_frame_equal(actual[mixed].drop(columns='City'), expected[mixed].drop(columns='City'))
+        pd.testing.assert_frame_equal(actual[mixed], legacy_transform(copy.deepcopy(fe), X[mixed]))
+    return int(mixed.sum())
+
+
+def check_training_parity(fe, X):
+    expected_df, expected_target, expected_top = legacy_clean_training(X)
+    fe = copy.deepcopy(fe)
+    target = fe.get_target(X)
+    pd.testing.assert_series_equal(target, expected_target)
+    # fit_transform scores the cleaned rows, aligned with the target; a later transform scores every row
+    assert fe.fit_transform(X).index.equals(expected_df.index)
+    assert fe.top_localities == expected_top
+    assert fe.price_per_sqft_median == expected_df['Price_per_SQFT'].median()
+    assert fe.area_quantile_75 == expected_df['Total_Area'].quantile(0.75)
+    for feature in ['City', 'Locality', 'Property_Size_Category', 'BHK_Category']:
+        assert list(fe.label_encoders[feature].classes_) == sorted(expected_df[feature].astype(str).unique())
+    assert fe.transform(X).index.equals(X.index)
+
+
+def check_chunked_scoring(fe, model_dir, chunksize=10):
+    """Score a file whose first chunk has an empty Balcony column and later ones "Yes", chunk by chunk"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from prediction_vs import score_csv
+    from model_registry import RealEstatePredictor
+
+    X = make_api_rows(fe, 4 * chunksize, seed=2)
+    X['Balcony'] = [None] * chunksize + ['Yes'] * (len(X) - chunksize)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'listings.csv')
+        X.to_csv(input_path, index=False)
+        expected = RealEstatePredictor(model_dir).predict_frame(pd.read_csv(input_path))
+        for name in ('scored.csv', 'scored.parquet'):
+            output_path = os.path.join(tmp, name)
+            score_csv(input_path, output_path, model_dir, chunksize=chunksize, workers=1)
+            scored = pd.read_parquet(output_path) if name.endswith('.parquet') else pd.read_csv(output_path)
+            assert len(scored) == len(X)
+            np.testing.assert_allclose(scored['Predicted_Price'].to_numpy(), np.asarray(expected), rtol=1e-12)
+
+
+def rows_per_second(func, X, min_seconds=0.5):
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        func(X)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return runs * len(X) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Pipeline .joblib (default: newest in Models/)")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--training-rows", type=int, default=100000, help="Raw scrape size for the training timing")
+    args = parser.parse_args()
+
+    model_path = args.model or sorted(glob.glob(DEFAULT_MODEL_GLOB))[-1]
+    fe = joblib.load(model_path).steps[0][1]
+
+    mixed = sum(check_parity(fe, X) for X in (make_api_rows(fe, 5000), make_training_rows(5000), make_api_rows(fe, 1)))
+    print(" Parity OK: vectorized transform matches the baseline row-by-row implementation "
+          f"(except City for {mixed:,} rows without a comma in mixed batches, as expected)")
+
+    legacy_fe = copy.deepcopy(fe)
+    print(f"{'rows':>8} {'row-by-row rows/s':>20} {'vectorized rows/s':>20} {'speedup':>8}")
+    for n in args.rows:
+        X = make_api_rows(fe, n)
+        legacy = rows_per_second(lambda df: legacy_transform(legacy_fe, df), X)
+        vectorized = rows_per_second(fe.transform, X)
+        print(f"{n:>8} {legacy:>20,.0f} {vectorized:>20,.0f} {vectorized / legacy:>7.1f}x")
+
+    check_training_parity(fe, make_training_rows(20000, with_price=True))
+    print(" Parity OK: shared training cleaning matches the row-by-row implementation")
+
+    check_chunked_scoring(fe, os.path.dirname(model_path))
+    print(" Parity OK: chunked bulk scoring matches scoring the whole file, CSV and Parquet")
+
+    X = make_training_rows(args.training_rows, with_price=True)
+    start = time.perf_counter()
+    legacy_clean_training(X)  # fit
+    legacy_clean_training(X)  # get_target
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    trained = copy.deepcopy(fe)
+    trained.get_target(X)
+    trained.fit_transform(X)
+    single_pass = time.perf_counter() - start
+    print(f" Training preprocessing on {len(X):,} raw rows: row-by-row fit + get_target {legacy:.2f}s, "
+          f"single pass get_target + fit_transform {single_pass:.2f}s ({legacy / single_pass:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,141 @@
 #!/usr/bin/env python3
-import pandas as pd
-import joblib
+"""Price prediction from the command line.
+
+Single example (as before):
+
+    python prediction_vs.py
+
+Bulk scoring of a listing dump, streamed in chunks across a process pool:
+
+    python prediction_vs.py score Predicted_Real_Estate_Prices.csv scored.csv --model-dir Models
+    python prediction_vs.py score listings.csv scored.parquet --chunksize 100000 --workers 8
+
+Each worker loads the pipeline once. At most two chunks per worker are in
+flight, and results are written in input order as they complete, so memory
+stays bounded regardless of the input size. Parquet output needs pyarrow.
+
+Every input column is read as text, so a chunk's dtypes never depend on which
+rows it happens to hold (an all-empty Balcony in one chunk, "Yes" in the
+next); the input columns are written back unchanged next to the prediction.
+"""
+import argparse
 import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pandas as pd
 from typing import Dict
 
-from feature_engineering import RealEstateFeatureEngineer
-
-class RealEstatePredictor:
-    
-    def __init__(self, model_dir: str = "models"):
-        self.model_dir = model_dir
-        self.pipeline = None
-        
-    def load_model(self):
-        model_files = [f for f in os.listdir(self.model_dir) 
-                      if f.startswith("real_estate_pipeline_") and f.endswith(".joblib")]
-        
-        if not model_files:
-            raise FileNotFoundError("No model files found!")
-        
-        latest_model = sorted(model_files)[-1]
-        model_path = os.path.join(self.model_dir, latest_model)
-        
-        self.pipeline = joblib.load(model_path)
-        print(f" Model loaded: {latest_model}")
-        
-    def predict(self, property_data: Dict) -> float:
-
-        if self.pipeline is None:
-            self.load_model()
-            
-        df = pd.DataFrame([property_data])
-        prediction = self.pipeline.predict(df)
-        return float(prediction[0])
-
-
-def predict_price(property_data: Dict) -> float:
-    predictor = RealEstatePredictor()
+# The pickled pipeline references the backend's feature_engineering module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from model_registry import RealEstatePredictor
+
+
+def predict_price(property_data: Dict, model_dir: str = None) -> float:
+    # Predictors share one loaded pipeline per process, so this never reloads from disk
+    predictor = RealEstatePredictor(model_dir)
     return predictor.predict(property_data)
 
-def main():
+
+# ----------------------------
+# Bulk scoring
+# ----------------------------
+_worker_model_dir = None
+
+# pandas' own boolean spellings, which read_csv would otherwise have parsed for us
+_TEXT_BOOLEANS = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+
+
+def _init_worker(model_dir: str):
+    global _worker_model_dir
+    _worker_model_dir = model_dir
+    # Parallelism comes from the process pool; no nested threads, and no hot reload mid-run
+    RealEstatePredictor(model_dir, n_jobs=1, check_interval=None).load_model()
+
+
+def _score_chunk(chunk: pd.DataFrame, output_column: str) -> pd.DataFrame:
+    predictor = RealEstatePredictor(_worker_model_dir)
+    features = chunk
+    if "Balcony" in chunk.columns:
+        balcony = chunk["Balcony"]
+        features = chunk.assign(Balcony=balcony.map(_TEXT_BOOLEANS).where(balcony.isin(_TEXT_BOOLEANS), balcony))
+    chunk[output_column] = predictor.predict_frame(features)
+    return chunk
+
+
+class _ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._first = True
+
+    def write(self, chunk: pd.DataFrame):
+        if self.parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                # A column that is empty throughout the first chunk has no type yet; it holds text
+                schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                    for field in table.schema])
+                self._writer = pq.ParquetWriter(self.path, schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_csv(input_path: str, output_path: str, model_dir: str = None, chunksize: int = 50000,
+              workers: int = None, output_column: str = "Predicted_Price") -> int:
+    """Stream input_path in chunks through a process pool and write predictions to output_path"""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    writer = _ChunkWriter(output_path)
+    pending = deque()
+    rows = 0
+    start = time.perf_counter()
+
+    def write_oldest():
+        nonlocal rows
+        scored = pending.popleft().result()
+        writer.write(scored)
+        rows += len(scored)
+        elapsed = time.perf_counter() - start
+        print(f"  {rows:,} rows scored, {rows / elapsed:,.0f} rows/s", file=sys.stderr)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_dir,)) as executor:
+            for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype=str):
+                if len(pending) >= max_in_flight:
+                    write_oldest()
+                pending.append(executor.submit(_score_chunk, chunk, output_column))
+            while pending:
+                write_oldest()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f" Scored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) "
+          f"with {workers} workers -> {output_path}", file=sys.stderr)
+    return rows
+
+
+def example(model_dir: str = None):
     property_data = {
         'Location': 'Whitefield',
         'City': 'Bangalore',
@@ -49,11 +145,29 @@ def main():
         'Bathroom': 2,
         'Balcony': True
     }
-    
-    price = predict_price(property_data)
-    
+
+    price = predict_price(property_data, model_dir)
+
     print(f"Property: {property_data['BHK']} BHK in {property_data['Location']}")
     print(f"Predicted Price: ₹{price:.1f} Lakhs (₹{price/100:.2f} Crores)")
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=None, help="Directory with real_estate_pipeline_*.joblib (default: REAL_ESTATE_MODEL_DIR or Models/)")
+    subparsers = parser.add_subparsers(dest="command")
+    score = subparsers.add_parser("score", help="Bulk-score a listings CSV")
+    score.add_argument("input", help="Input CSV")
+    score.add_argument("output", help="Output .csv or .parquet")
+    score.add_argument("--model-dir", default=argparse.SUPPRESS, help="Directory with real_estate_pipeline_*.joblib")
+    score.add_argument("--chunksize", type=int, default=50000, help="Rows per chunk (default: 50000)")
+    score.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    score.add_argument("--output-column", default="Predicted_Price", help="Column receiving the prediction")
+    args = parser.parse_args()
+
+    if args.command == "score":
+        score_csv(args.input, args.output, args.model_dir, args.chunksize, args.workers, args.output_column)
+    else:
+        example(args.model_dir)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file